@@ -1,23 +1,19 @@
-import requests, os, textwrap
-from typing import Dict, List, Tuple
+import requests, os, re, sys, json, gzip, textwrap, threading, importlib.util
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Set, Tuple
 from colorama import Fore, Style, init
 from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from tabulate import tabulate
 from dotenv import load_dotenv
 
+REPORTLAB_AVAILABLE = importlib.util.find_spec("reportlab") is not None
+REPORTLAB_LOADED = False
+
 try:
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-    REPORTLAB_AVAILABLE = True
+    from orjson import loads as json_loads
 except ImportError:
-    REPORTLAB_AVAILABLE = False
+    json_loads = json.loads
 
 load_dotenv('.env')
 init(autoreset=True)
@@ -25,6 +21,16 @@ init(autoreset=True)
 API_BASE_URL = 'https://railspaapi.shohoz.com/v1.0'
 SEAT_AVAILABILITY = {'AVAILABLE': 1, 'IN_PROCESS': 2}
 
+SESSION = requests.Session()
+HTTP_RETRY = Retry(
+    total=1,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(('GET', 'POST')),
+    raise_on_status=False
+)
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=HTTP_RETRY))
+
 def load_config():
     train_model = os.getenv("TRAIN_MODEL")
     date_of_journey = os.getenv("DATE_OF_JOURNEY")
@@ -45,14 +51,135 @@ BANGLA_COACH_ORDER = [
     "XTR3", "XTR4", "XTR5", "SLR", "STD"
 ]
 COACH_INDEX = {coach: idx for idx, coach in enumerate(BANGLA_COACH_ORDER)}
+UNKNOWN_COACH_ORDER = len(BANGLA_COACH_ORDER) + 1
+ISSUED_TICKET_TYPES = frozenset((1, 3))
+USE_FAST_GRID = True
+SEAT_TYPES = ("S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR")
 
 TOKEN = None
 TOKEN_TIMESTAMP = None
+TOKEN_LOCK = threading.Lock()
+TOKEN_TTL = timedelta(minutes=55)
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=30)
+TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".bdrailway_token.json")
 
 def set_token(token: str):
     global TOKEN, TOKEN_TIMESTAMP
     TOKEN = token
     TOKEN_TIMESTAMP = datetime.now(timezone.utc)
+    save_cached_token(token, TOKEN_TIMESTAMP + TOKEN_TTL)
+
+def save_cached_token(token: str, expires_at: datetime):
+    cached = {
+        "mobile_number": os.getenv("MOBILE_NUMBER"),
+        "token": token,
+        "expires_at": expires_at.isoformat()
+    }
+    try:
+        fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'w') as token_file:
+            json.dump(cached, token_file)
+    except OSError:
+        pass
+
+def load_cached_token() -> Tuple[Optional[str], Optional[datetime]]:
+    try:
+        with open(TOKEN_CACHE_PATH, 'r') as token_file:
+            cached = json.load(token_file)
+        expires_at = datetime.fromisoformat(cached["expires_at"])
+        token = cached["token"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, None
+    
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    
+    if cached.get("mobile_number") != os.getenv("MOBILE_NUMBER"):
+        return None, None
+    if expires_at <= datetime.now(timezone.utc) + TOKEN_EXPIRY_MARGIN:
+        return None, None
+    
+    return token, expires_at
+
+def ensure_token() -> str:
+    global TOKEN, TOKEN_TIMESTAMP
+    
+    with TOKEN_LOCK:
+        if TOKEN and TOKEN_TIMESTAMP + TOKEN_TTL > datetime.now(timezone.utc) + TOKEN_EXPIRY_MARGIN:
+            return TOKEN
+        
+        token, expires_at = load_cached_token()
+        if token:
+            TOKEN = token
+            TOKEN_TIMESTAMP = expires_at - TOKEN_TTL
+        else:
+            set_token(fetch_token())
+        return TOKEN
+
+def refresh_token(expired_token: str) -> str:
+    with TOKEN_LOCK:
+        if TOKEN == expired_token:
+            set_token(fetch_token())
+        return TOKEN
+
+COLLECTION_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+COLLECTION_CACHE_TTL = timedelta(hours=1)
+COLLECTION_CACHE_VERSION = 2
+CACHE_KEY_UNSAFE_RE = re.compile(r'[^A-Za-z0-9_-]')
+
+def get_collection_cache_path(train_model: str, api_date: str) -> str:
+    safe_model = CACHE_KEY_UNSAFE_RE.sub('_', train_model)
+    safe_date = CACHE_KEY_UNSAFE_RE.sub('_', api_date)
+    return os.path.join(COLLECTION_CACHE_DIR, f"{safe_model}_{safe_date}.json.gz")
+
+def intern_route_matrices(matrices: Dict) -> Dict:
+    return {
+        sys.intern(seat_type): {
+            sys.intern(from_city): {sys.intern(to_city): value for to_city, value in destinations.items()}
+            for from_city, destinations in seat_type_routes.items()
+        }
+        for seat_type, seat_type_routes in matrices.items()
+    }
+
+def save_collection_cache(cache_path: str, train_data: Dict, issued_matrices: Dict, fare_matrices: Dict, seat_types_with_tickets: Set[str]):
+    cached = {
+        "version": COLLECTION_CACHE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "train_data": train_data,
+        "issued": issued_matrices,
+        "fares": fare_matrices,
+        "seat_types_with_tickets": sorted(seat_types_with_tickets)
+    }
+    try:
+        os.makedirs(COLLECTION_CACHE_DIR, exist_ok=True)
+        with gzip.open(cache_path, 'wt', encoding='utf-8') as cache_file:
+            json.dump(cached, cache_file, ensure_ascii=False)
+    except OSError:
+        pass
+
+def load_collection_cache(cache_path: str) -> Dict:
+    try:
+        with gzip.open(cache_path, 'rb') as cache_file:
+            cached = json_loads(cache_file.read())
+        created_at = datetime.fromisoformat(cached["created_at"])
+    except (OSError, EOFError, ValueError, KeyError, TypeError):
+        return None
+    
+    if cached.get("version") != COLLECTION_CACHE_VERSION:
+        return None
+    if created_at + COLLECTION_CACHE_TTL <= datetime.now(timezone.utc):
+        return None
+    
+    try:
+        cached["issued"] = intern_route_matrices(cached["issued"])
+        cached["fares"] = intern_route_matrices(cached["fares"])
+        cached["seat_types_with_tickets"] = {sys.intern(seat_type) for seat_type in cached["seat_types_with_tickets"]}
+    except (KeyError, AttributeError, TypeError):
+        return None
+    
+    return cached
 
 def fetch_token() -> str:
     mobile_number = os.getenv("MOBILE_NUMBER")
@@ -64,40 +191,34 @@ def fetch_token() -> str:
     url = f"{API_BASE_URL}/app/auth/sign-in"
     payload = {"mobile_number": mobile_number, "password": password}
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.post(url, json=payload)
-            if response.status_code == 403:
-                raise Exception("Rate limit exceeded. Please try again later.")
-            
-            if response.status_code == 422:
-                raise Exception("Invalid credentials. Please check mobile number and password.")
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
-                continue
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            return data["data"]["token"]
-        except requests.RequestException as e:
-            if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                raise Exception("Rate limit exceeded. Please try again later.")
-            if retry_count == max_retries - 1:
-                raise Exception(f"Failed to fetch token: {str(e)}")
-            retry_count += 1
+    try:
+        response = SESSION.post(url, json=payload)
+        if response.status_code == 403:
+            raise Exception("Rate limit exceeded. Please try again later.")
+        
+        if response.status_code == 422:
+            raise Exception("Invalid credentials. Please check mobile number and password.")
+        
+        if response.status_code >= 500:
+            raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
+        
+        response.raise_for_status()
+        
+        data = json_loads(response.content)
+        return data["data"]["token"]
+    except requests.RequestException as e:
+        if hasattr(e, 'response') and e.response and e.response.status_code == 403:
+            raise Exception("Rate limit exceeded. Please try again later.")
+        raise Exception(f"Failed to fetch token: {str(e)}")
 
 def sort_seat_number(seat: str) -> tuple:
     parts = seat.split('-')
     coach = parts[0]
-    coach_order = COACH_INDEX.get(coach, len(BANGLA_COACH_ORDER) + 1)
-    coach_fallback = coach if coach not in COACH_INDEX else ""
+    coach_order = COACH_INDEX.get(coach)
+    if coach_order is None:
+        coach_order, coach_fallback = UNKNOWN_COACH_ORDER, coach
+    else:
+        coach_fallback = ""
     
     if len(parts) == 2:
         try:
@@ -110,118 +231,91 @@ def sort_seat_number(seat: str) -> tuple:
         except ValueError:
             return (coach_order, coach_fallback, 0, parts[1])
     
-    return (len(BANGLA_COACH_ORDER) + 1, seat, 0, '')
+    return (UNKNOWN_COACH_ORDER, seat, 0, '')
 
 def analyze_issued_tickets(data: Dict) -> Dict:
     layout = data.get("data", {}).get("seatLayout", [])
     if not layout:
         return {}
     
-    issued_seats = []
-    
-    for floor in layout:
-        for row in floor["layout"]:
-            for seat in row:
-                if seat["seat_number"] and seat["ticket_type"] in [1, 3]:
-                    issued_seats.append(seat["seat_number"])
+    issued_seats = [
+        seat_number
+        for floor in layout
+        for row in floor["layout"]
+        for seat in row
+        if seat["ticket_type"] in ISSUED_TICKET_TYPES and (seat_number := seat["seat_number"])
+    ]
     
-    issued_seats_sorted = sorted(issued_seats, key=sort_seat_number)
+    issued_seats.sort(key=sort_seat_number)
     
     return {
-        "issued_tickets": issued_seats_sorted,
-        "count": len(issued_seats_sorted)
+        "issued_tickets": issued_seats,
+        "count": len(issued_seats)
     }
 
 def get_seat_layout_for_route(trip_id: str, trip_route_id: str) -> Tuple[Dict, bool, str]:
-    global TOKEN
-    
-    if not TOKEN:
-        TOKEN = fetch_token()
-        set_token(TOKEN)
+    token = ensure_token()
     
     url = f"{API_BASE_URL}/app/bookings/seat-layout"
-    headers = {"Authorization": f"Bearer {TOKEN}"}
+    headers = {"Authorization": f"Bearer {token}"}
     params = {"trip_id": trip_id, "trip_route_id": trip_route_id}
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code == 401:
-                TOKEN = fetch_token()
-                set_token(TOKEN)
-                headers["Authorization"] = f"Bearer {TOKEN}"
-                response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code == 403:
-                return {}, True, "Rate limit exceeded. Please try again later."
-            
-            if response.status_code == 422:
-                error_data = response.json()
-                error_messages = error_data.get("error", {}).get("messages", [])
-                error_msg = error_messages[0] if isinstance(error_messages, list) and error_messages else "Route not available"
-                return {}, True, error_msg
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    return {}, True, "We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes."
-                continue
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            issued_tickets_info = analyze_issued_tickets(data)
-            return issued_tickets_info, False, ""
-            
-        except requests.RequestException as e:
-            if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                return {}, True, "Rate limit exceeded. Please try again later."
-            if retry_count == max_retries - 1:
-                return {}, True, f"Request failed: {str(e)}"
-            retry_count += 1
+    try:
+        response = SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code == 401:
+            token = refresh_token(token)
+            headers["Authorization"] = f"Bearer {token}"
+            response = SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code == 403:
+            return {}, True, "Rate limit exceeded. Please try again later."
+        
+        if response.status_code == 422:
+            error_data = json_loads(response.content)
+            error_messages = error_data.get("error", {}).get("messages", [])
+            error_msg = error_messages[0] if isinstance(error_messages, list) and error_messages else "Route not available"
+            return {}, True, error_msg
+        
+        if response.status_code >= 500:
+            return {}, True, "We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes."
+        
+        response.raise_for_status()
+        data = json_loads(response.content)
+        
+        issued_tickets_info = analyze_issued_tickets(data)
+        return issued_tickets_info, False, ""
+        
+    except requests.RequestException as e:
+        if hasattr(e, 'response') and e.response and e.response.status_code == 403:
+            return {}, True, "Rate limit exceeded. Please try again later."
+        return {}, True, f"Request failed: {str(e)}"
 
 def fetch_train_data(model: str, departure_date: str) -> Dict:
-    global TOKEN
-    
-    if not TOKEN:
-        TOKEN = fetch_token()
-        set_token(TOKEN)
+    token = ensure_token()
         
     url = f"{API_BASE_URL}/app/train-routes"
     payload = {
         "model": model,
         "departure_date_time": departure_date
     }
-    headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {TOKEN}'}
+    headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'}
 
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            if response.status_code == 403:
-                raise Exception("Rate limit exceeded. Please try again later.")
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
-                continue
-            
-            response.raise_for_status()
-            return response.json().get('data')
-        except requests.RequestException as e:
-            if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                raise Exception("Rate limit exceeded. Please try again later.")
-            if retry_count == max_retries - 1:
-                print(f"{Fore.RED}Failed to fetch train data: {str(e)}")
-                return None
-            retry_count += 1
+    try:
+        response = SESSION.post(url, json=payload, headers=headers)
+        if response.status_code == 403:
+            raise Exception("Rate limit exceeded. Please try again later.")
+        
+        if response.status_code >= 500:
+            raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
+        
+        response.raise_for_status()
+        return json_loads(response.content).get('data')
+    except requests.RequestException as e:
+        if hasattr(e, 'response') and e.response and e.response.status_code == 403:
+            raise Exception("Rate limit exceeded. Please try again later.")
+        print(f"{Fore.RED}Failed to fetch train data: {str(e)}")
+        return None
 
 def normalize_city_name_for_comparison(city_name: str) -> str:
     return city_name.lower().replace("'", "")
@@ -234,156 +328,442 @@ def get_route_availability(from_city: str, to_city: str, date_str: str, target_m
         "date_of_journey": date_str,
         "seat_class": "SHULOV"
     }
+    normalized_from_city = normalize_city_name_for_comparison(from_city)
+    normalized_to_city = normalize_city_name_for_comparison(to_city)
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.get(url, params=params)
-            if response.status_code == 403:
-                print(f"{Fore.YELLOW}Rate limit exceeded for {from_city} to {to_city}. Skipping...")
-                return None
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    print(f"{Fore.YELLOW}Server error for {from_city} to {to_city}. Skipping...")
-                    return None
-                continue
-            
-            response.raise_for_status()
-            
-            trains = response.json().get("data", {}).get("trains", [])
-            for train in trains:
-                if train.get("train_model") == target_model:
-                    returned_origin = train.get("origin_city_name", "")
-                    returned_destination = train.get("destination_city_name", "")
-                    
-                    if (normalize_city_name_for_comparison(from_city) == normalize_city_name_for_comparison(returned_origin) and
-                        normalize_city_name_for_comparison(to_city) == normalize_city_name_for_comparison(returned_destination)):
-                        return train
-            
+    try:
+        response = SESSION.get(url, params=params)
+        if response.status_code == 403:
+            print(f"{Fore.YELLOW}Rate limit exceeded for {from_city} to {to_city}. Skipping...")
             return None
-            
-        except requests.RequestException as e:
-            if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                print(f"{Fore.YELLOW}Rate limit exceeded for {from_city} to {to_city}. Skipping...")
-                return None
-            if retry_count == max_retries - 1:
-                print(f"{Fore.RED}Failed to fetch route data for {from_city} to {to_city}: {str(e)}")
-                return None
-            retry_count += 1
-
-class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
-        self.custom_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
         
-        try:
+        if response.status_code >= 500:
+            print(f"{Fore.YELLOW}Server error for {from_city} to {to_city}. Skipping...")
+            return None
+        
+        response.raise_for_status()
+        
+        trains = json_loads(response.content).get("data", {}).get("trains", [])
+        for train in trains:
+            if train.get("train_model") == target_model:
+                returned_origin = train.get("origin_city_name", "")
+                returned_destination = train.get("destination_city_name", "")
+                
+                if (normalized_from_city == normalize_city_name_for_comparison(returned_origin) and
+                    normalized_to_city == normalize_city_name_for_comparison(returned_destination)):
+                    return train
+        
+        return None
+        
+    except requests.RequestException as e:
+        if hasattr(e, 'response') and e.response and e.response.status_code == 403:
+            print(f"{Fore.YELLOW}Rate limit exceeded for {from_city} to {to_city}. Skipping...")
+            return None
+        print(f"{Fore.RED}Failed to fetch route data for {from_city} to {to_city}: {str(e)}")
+        return None
+
+def load_reportlab():
+    global REPORTLAB_LOADED, SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    global getSampleStyleSheet, ParagraphStyle, colors, inch, A4, canvas, pdfmetrics, TTFont, NumberedCanvas
+    if REPORTLAB_LOADED:
+        return
+    
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    
+    class NumberedCanvas(canvas.Canvas):
+        def __init__(self, *args, **kwargs):
+            canvas.Canvas.__init__(self, *args, **kwargs)
+            self._saved_page_states = []
+            self.custom_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
+            
             try:
-                pdfmetrics.getFont('PlusJakartaSans-Regular')
-                self.page_font = 'PlusJakartaSans-Regular'
+                try:
+                    pdfmetrics.getFont('PlusJakartaSans-Regular')
+                    self.page_font = 'PlusJakartaSans-Regular'
+                except:
+                    self.page_font = 'Helvetica'
             except:
                 self.page_font = 'Helvetica'
-        except:
-            self.page_font = 'Helvetica'
-
-    def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for (page_num, page_state) in enumerate(self._saved_page_states):
-            self.__dict__.update(page_state)
-            self.draw_page_number(page_num + 1, num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_number(self, page_num, total_pages):
-        self.setFont(self.page_font, 10)
-        self.setFillColor(self.custom_green)
-        page_text = f"Page {page_num} of {total_pages}"
-        self.drawCentredString(A4[0]/2, 30, page_text)
-
-def create_route_summary_data(issued_matrices: Dict, fare_matrices: Dict, stations: List[str]) -> Dict:
-    route_summary = {}
-    
-    seat_types_with_data = []
-    for seat_type in ["S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR"]:
-        has_data = any(
-            any(len(seats) > 0 for seats in from_routes.values())
-            for from_routes in issued_matrices[seat_type].values()
-        )
-        if has_data:
-            seat_types_with_data.append(seat_type)
+
+        def showPage(self):
+            self._saved_page_states.append(dict(self.__dict__))
+            self._startPage()
+
+        def save(self):
+            num_pages = len(self._saved_page_states)
+            for (page_num, page_state) in enumerate(self._saved_page_states):
+                self.__dict__.update(page_state)
+                self.draw_page_number(page_num + 1, num_pages)
+                canvas.Canvas.showPage(self)
+            canvas.Canvas.save(self)
+
+        def draw_page_number(self, page_num, total_pages):
+            self.setFont(self.page_font, 10)
+            self.setFillColor(self.custom_green)
+            page_text = f"Page {page_num} of {total_pages}"
+            self.drawCentredString(A4[0]/2, 30, page_text)
     
+    REPORTLAB_LOADED = True
+
+def summarize_issued_matrices(issued_matrices: Dict) -> Dict[str, Tuple[int, int]]:
+    issued_summary = {}
+    
+    for seat_type, seat_type_routes in issued_matrices.items():
+        ticket_counts = [len(seats) for from_routes in seat_type_routes.values() for seats in from_routes.values() if seats]
+        issued_summary[seat_type] = (len(ticket_counts), sum(ticket_counts))
+    
+    return issued_summary
+
+def get_issued_routes(seat_type_routes: Dict, station_order: Dict[str, int]) -> List[Tuple[str, str, List[str]]]:
+    issued_routes = [
+        (from_station, to_station, seats)
+        for from_station, destinations in seat_type_routes.items()
+        for to_station, seats in destinations.items()
+        if seats
+    ]
+    issued_routes.sort(key=lambda route: (station_order[route[0]], station_order[route[1]]))
+    return issued_routes
+
+def format_grid_row(cells: List[List[str]], widths: List[int], numeric_columns: List[bool]) -> str:
+    row_lines = []
+    for line_index in range(max(len(lines) for lines in cells)):
+        parts = []
+        for column, lines in enumerate(cells):
+            text = lines[line_index] if line_index < len(lines) else ""
+            parts.append(text.rjust(widths[column]) if numeric_columns[column] else text.ljust(widths[column]))
+        row_lines.append("| " + " | ".join(parts) + " |\n")
+    return "".join(row_lines)
+
+def wrap_grid_cell(cell, max_width: int = None) -> List[str]:
+    lines = str(cell).split("\n")
+    if not max_width:
+        return lines
+    
+    wrapped_lines = []
+    for line in lines:
+        if len(line) > max_width:
+            wrapped_lines.extend(textwrap.wrap(line, max_width) or [""])
+        else:
+            wrapped_lines.append(line)
+    return wrapped_lines
+
+def print_grid(rows: List[List], headers: List[str], maxcolwidths: List[int] = None):
+    if not USE_FAST_GRID:
+        from tabulate import tabulate
+        print(tabulate(rows, headers=headers, tablefmt="grid", maxcolwidths=maxcolwidths))
+        return
+    
+    if maxcolwidths is None:
+        maxcolwidths = [None] * len(headers)
+    header_cells = [str(header).split("\n") for header in headers]
+    row_cells = [[wrap_grid_cell(cell, max_width) for cell, max_width in zip(row, maxcolwidths)] for row in rows]
+    
+    widths = [max(len(line) for line in lines) for lines in header_cells]
+    for cells in row_cells:
+        for column, lines in enumerate(cells):
+            widths[column] = max(widths[column], max(len(line) for line in lines))
+    numeric_columns = [all(isinstance(row[column], (int, float)) for row in rows) for column in range(len(headers))]
+    
+    border = "+" + "+".join("-" * (width + 2) for width in widths) + "+\n"
+    output = [border, format_grid_row(header_cells, widths, numeric_columns), border.replace("-", "=")]
+    for cells in row_cells:
+        output.append(format_grid_row(cells, widths, numeric_columns))
+        output.append(border)
+    
+    sys.stdout.write("".join(output))
+    sys.stdout.flush()
+
+def create_route_summary_data(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], issued_summary: Dict = None, seat_types_with_tickets: Set[str] = None) -> Tuple[List[Tuple[str, str, List[int], List[float]]], List[str]]:
+    if seat_types_with_tickets is None:
+        if issued_summary is None:
+            issued_summary = summarize_issued_matrices(issued_matrices)
+        seat_types_with_tickets = {seat_type for seat_type, (routes_with_tickets, _) in issued_summary.items() if routes_with_tickets > 0}
+    
+    seat_types_with_data = [seat_type for seat_type in SEAT_TYPES if seat_type in seat_types_with_tickets]
+    
+    count_table = {
+        (from_station, to_station, seat_type): len(seats)
+        for seat_type in seat_types_with_data
+        for from_station, destinations in issued_matrices[seat_type].items()
+        for to_station, seats in destinations.items()
+    }
+    fare_table = {
+        (from_station, to_station, seat_type): fare
+        for seat_type in seat_types_with_data
+        for from_station, destinations in fare_matrices[seat_type].items()
+        for to_station, fare in destinations.items()
+    }
+    
+    route_rows = []
     for from_station in stations:
-        route_summary[from_station] = {}
         for to_station in stations:
             if from_station != to_station:
-                route_summary[from_station][to_station] = {}
-                
-                for seat_type in seat_types_with_data:
-                    count = 0
-                    fare = 0
-                    if (from_station in issued_matrices[seat_type] and 
-                        to_station in issued_matrices[seat_type][from_station]):
-                        count = len(issued_matrices[seat_type][from_station][to_station])
-                    
-                    if (from_station in fare_matrices[seat_type] and 
-                        to_station in fare_matrices[seat_type][from_station]):
-                        fare = fare_matrices[seat_type][from_station][to_station]
-                    
-                    route_summary[from_station][to_station][seat_type] = {
-                        "count": count,
-                        "fare": fare
-                    }
+                counts = [count_table.get((from_station, to_station, seat_type), 0) for seat_type in seat_types_with_data]
+                if any(counts):
+                    fares = [fare_table.get((from_station, to_station, seat_type), 0) for seat_type in seat_types_with_data]
+                    route_rows.append((from_station, to_station, counts, fares))
+    
+    return route_rows, seat_types_with_data
+
+def build_report_data(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], seat_types_with_tickets: Set[str] = None) -> Dict:
+    issued_summary = summarize_issued_matrices(issued_matrices)
+    if seat_types_with_tickets is None:
+        seat_types_with_tickets = {seat_type for seat_type, (routes_with_tickets, _) in issued_summary.items() if routes_with_tickets > 0}
+    
+    station_order = {station: index for index, station in enumerate(stations)}
+    issued_rows = {
+        seat_type: [
+            (from_station, to_station, seats, format_seat_list(seats, for_pdf=True))
+            for from_station, to_station, seats in get_issued_routes(issued_matrices[seat_type], station_order)
+        ]
+        for seat_type in SEAT_TYPES
+        if seat_type in seat_types_with_tickets
+    }
+    route_rows, seat_types_with_data = create_route_summary_data(issued_matrices, fare_matrices, stations, issued_summary, seat_types_with_tickets)
     
-    return route_summary, seat_types_with_data
+    return {
+        "issued_summary": issued_summary,
+        "issued_rows": issued_rows,
+        "route_rows": route_rows,
+        "seat_types_with_data": seat_types_with_data
+    }
+
+def wrap_seat_list(seats: List[str], width: int = 60) -> List[str]:
+    lines = []
+    line = ""
+    last_index = len(seats) - 1
+    for index, seat in enumerate(seats):
+        token = seat if index == last_index else seat + ","
+        if line and len(line) + 1 + len(token) > width:
+            lines.append(line)
+            line = token
+        else:
+            line = f"{line} {token}" if line else token
+    lines.append(line)
+    return lines
 
 def format_seat_list(seats: List[str], for_pdf: bool = False) -> str:
     if not seats:
         return "None"
     
-    seat_str = ", ".join(seats)
+    wrapped_lines = wrap_seat_list(seats)
     if for_pdf:
-        wrapped_lines = textwrap.wrap(seat_str, width=60)
         return wrapped_lines
     else:
-        wrapped = textwrap.fill(seat_str, width=60)
-        return wrapped
+        return "\n".join(wrapped_lines)
 
-def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], train_data: Dict, config: Dict):
-    if not REPORTLAB_AVAILABLE:
-        print(f"{Fore.RED}Cannot generate PDF: reportlab library not installed")
-        print(f"{Fore.YELLOW}Install with: pip install reportlab")
-        return
+PDF_FONTS = None
+PDF_STYLES = None
+
+def register_pdf_fonts() -> Tuple[str, str, str, bool]:
+    global PDF_FONTS
+    if PDF_FONTS is not None:
+        return PDF_FONTS
     
     try:
-        font_regular_path = os.path.join("assets", "PlusJakartaSans-Regular.ttf")
-        font_bold_path = os.path.join("assets", "PlusJakartaSans-Bold.ttf")
-        font_bengali_path = os.path.join("assets", "NotoSansBengali-Regular.ttf")
+        font_names = ['PlusJakartaSans-Regular', 'PlusJakartaSans-Bold', 'NotoSansBengali-Regular']
+        font_paths = [os.path.join("assets", f"{font_name}.ttf") for font_name in font_names]
         
-        pdfmetrics.registerFont(TTFont('PlusJakartaSans-Regular', font_regular_path))
-        pdfmetrics.registerFont(TTFont('PlusJakartaSans-Bold', font_bold_path))
-        pdfmetrics.registerFont(TTFont('NotoSansBengali-Regular', font_bengali_path))
-        
-        regular_font = 'PlusJakartaSans-Regular'
-        bold_font = 'PlusJakartaSans-Bold'
-        bengali_font = 'NotoSansBengali-Regular'
-        use_taka_symbol = True
+        with ThreadPoolExecutor(max_workers=len(font_names)) as executor:
+            fonts = list(executor.map(TTFont, font_names, font_paths))
         
+        for font in fonts:
+            pdfmetrics.registerFont(font)
+
+        PDF_FONTS = ('PlusJakartaSans-Regular', 'PlusJakartaSans-Bold', 'NotoSansBengali-Regular', True)
+
         print(f"{Fore.GREEN}Custom fonts loaded successfully")
-        
+
     except Exception as e:
         print(f"{Fore.YELLOW}Warning: Could not load custom fonts ({str(e)}). Using default fonts.")
-        regular_font = 'Helvetica'
-        bold_font = 'Helvetica-Bold'
-        bengali_font = 'Helvetica'
-        use_taka_symbol = False
+        PDF_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica', False)
+    
+    return PDF_FONTS
+
+def get_pdf_styles() -> Dict:
+    global PDF_STYLES
+    if PDF_STYLES is not None:
+        return PDF_STYLES
+    
+    regular_font, bold_font, bengali_font, use_taka_symbol = register_pdf_fonts()
+    custom_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
+    light_green = colors.Color(0xE8/255.0, 0xF5/255.0, 0xF0/255.0)
+    
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1,
+        textColor=custom_green,
+        fontName=bold_font
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=15,
+        spaceBefore=10,
+        textColor=custom_green,
+        fontName=bold_font
+    )
+
+    matrix_title_style = ParagraphStyle(
+        'MatrixTitleStyle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        spaceAfter=20,
+        spaceBefore=10,
+        textColor=custom_green,
+        fontName=bold_font,
+        alignment=1,
+        borderWidth=2,
+        borderColor=custom_green,
+        borderPadding=10,
+        backColor=light_green
+    )
+
+    info_style = ParagraphStyle(
+        'InfoStyle',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=8,
+        leftIndent=20,
+        fontName=regular_font
+    )
+
+    disclaimer_style = ParagraphStyle(
+        'DisclaimerStyle',
+        parent=styles['Normal'],
+        fontSize=6.5,
+        spaceAfter=45,
+        spaceBefore=1,
+        textColor=colors.red,
+        borderWidth=0.5,
+        borderColor=colors.red,
+        fontName=regular_font,
+        alignment=1,
+        backColor=colors.Color(1.0, 0.95, 0.95)
+    )
+
+    currency_style = ParagraphStyle(
+        'CurrencyStyle',
+        parent=styles['Normal'],
+        fontSize=6,
+        alignment=1,
+        fontName=bengali_font if use_taka_symbol else regular_font,
+        textColor=colors.gray
+    )
+
+    train_info_style = ParagraphStyle(
+        'TrainInfoStyle',
+        parent=styles['Normal'],
+        fontSize=12,
+        spaceAfter=3,
+        alignment=1,
+        textColor=custom_green,
+        fontName=bold_font
+    )
+
+    route_info_style = ParagraphStyle(
+        'RouteInfoStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=15,
+        alignment=1,
+        textColor=colors.black,
+        fontName=regular_font
+    )
+
+    route_header_style = ParagraphStyle(
+        'RouteHeaderStyle',
+        parent=styles['Normal'],
+        fontName=bold_font,
+        fontSize=9,
+        alignment=1,
+        textColor=colors.white
+    )
+
+    route_cell_style = ParagraphStyle(
+        'RouteCellStyle',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=1,
+        fontName=regular_font
+    )
+
+    route_count_style = ParagraphStyle(
+        'RouteCountStyle',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=1,
+        fontName=regular_font
+    )
+
+    matrix_cell_style = ParagraphStyle(
+        'CellStyle',
+        parent=styles['Normal'],
+        fontSize=9,
+        alignment=1,
+        fontName=regular_font
+    )
+
+    matrix_seat_style = ParagraphStyle(
+        'SeatStyle',
+        parent=styles['Normal'],
+        fontSize=8,
+        alignment=0,
+        fontName=regular_font,
+        leading=10
+    )
+
+    PDF_STYLES = {
+        "sample": styles,
+        "title": title_style,
+        "heading": heading_style,
+        "matrix_title": matrix_title_style,
+        "info": info_style,
+        "disclaimer": disclaimer_style,
+        "currency": currency_style,
+        "train_info": train_info_style,
+        "route_info": route_info_style,
+        "route_header": route_header_style,
+        "route_cell": route_cell_style,
+        "route_count": route_count_style,
+        "matrix_cell": matrix_cell_style,
+        "matrix_seat": matrix_seat_style
+    }
+    return PDF_STYLES
+
+def fit_table_cell(text: str, style, max_width: float):
+    if pdfmetrics.stringWidth(text, style.fontName, style.fontSize) <= max_width:
+        return text
+    return Paragraph(text, style)
+
+def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], train_data: Dict, config: Dict, report_data: Dict = None):
+    if not REPORTLAB_AVAILABLE:
+        print(f"{Fore.RED}Cannot generate PDF: reportlab library not installed")
+        print(f"{Fore.YELLOW}Install with: pip install reportlab")
+        return
+    
+    load_reportlab()
+    regular_font, bold_font, bengali_font, use_taka_symbol = register_pdf_fonts()
+    pdf_styles = get_pdf_styles()
+    
+    if report_data is None:
+        report_data = build_report_data(issued_matrices, fare_matrices, stations)
+    issued_summary = report_data["issued_summary"]
+    issued_rows = report_data["issued_rows"]
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"BDRAILWAY_ISSUED_TICKETS_REPORT_{config['train_model']}_{timestamp}.pdf"
@@ -401,74 +781,12 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         custom_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
         light_green = colors.Color(0xE8/255.0, 0xF5/255.0, 0xF0/255.0)
         
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=30,
-            alignment=1,
-            textColor=custom_green,
-            fontName=bold_font
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=15,
-            spaceBefore=10,
-            textColor=custom_green,
-            fontName=bold_font
-        )
-        
-        matrix_title_style = ParagraphStyle(
-            'MatrixTitleStyle',
-            parent=styles['Heading2'],
-            fontSize=16,
-            spaceAfter=20,
-            spaceBefore=10,
-            textColor=custom_green,
-            fontName=bold_font,
-            alignment=1,
-            borderWidth=2,
-            borderColor=custom_green,
-            borderPadding=10,
-            backColor=light_green
-        )
-        
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=8,
-            leftIndent=20,
-            fontName=regular_font
-        )
-
-        disclaimer_style = ParagraphStyle(
-            'DisclaimerStyle',
-            parent=styles['Normal'],
-            fontSize=6.5,
-            spaceAfter=45,
-            spaceBefore=1,
-            textColor=colors.red,
-            borderWidth=0.5,
-            borderColor=colors.red,
-            fontName=regular_font,
-            alignment=1,
-            backColor=colors.Color(1.0, 0.95, 0.95)
-        )
-
-        currency_style = ParagraphStyle(
-            'CurrencyStyle',
-            parent=styles['Normal'],
-            fontSize=6,
-            alignment=1,
-            fontName=bengali_font if use_taka_symbol else regular_font,
-            textColor=colors.gray
-        )
+        styles = pdf_styles["sample"]
+        title_style = pdf_styles["title"]
+        heading_style = pdf_styles["heading"]
+        matrix_title_style = pdf_styles["matrix_title"]
+        info_style = pdf_styles["info"]
+        disclaimer_style = pdf_styles["disclaimer"]
         
         story = []
         story.append(Paragraph("BANGLADESH RAILWAY ISSUED TICKETS REPORT", title_style))
@@ -560,17 +878,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         
         summary_data = [["Seat Type", "Available Routes", "Total Issued Tickets"]]
         
-        seat_types = ["S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR"]
-        
-        for seat_type in seat_types:
-            routes_with_tickets = 0
-            total_tickets = 0
-            
-            for from_routes in issued_matrices[seat_type].values():
-                for seats in from_routes.values():
-                    if seats:
-                        routes_with_tickets += 1
-                        total_tickets += len(seats)
+        for seat_type in SEAT_TYPES:
+            routes_with_tickets, total_tickets = issued_summary[seat_type]
             
             if routes_with_tickets > 0:
                 summary_data.append([seat_type, str(routes_with_tickets), str(total_tickets)])
@@ -598,30 +907,14 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
 
         story.append(PageBreak())
         
-        route_summary, seat_types_with_data = create_route_summary_data(issued_matrices, fare_matrices, stations)
+        route_rows = report_data["route_rows"]
+        seat_types_with_data = report_data["seat_types_with_data"]
         
         story.append(Paragraph("ROUTE-WISE ISSUED TICKET SUMMARY", title_style))
         story.append(Spacer(1, 5))
 
-        train_info_style = ParagraphStyle(
-            'TrainInfoStyle',
-            parent=styles['Normal'],
-            fontSize=12,
-            spaceAfter=3,
-            alignment=1,
-            textColor=custom_green,
-            fontName=bold_font
-        )
-        
-        route_info_style = ParagraphStyle(
-            'RouteInfoStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=15,
-            alignment=1,
-            textColor=colors.black,
-            fontName=regular_font
-        )
+        train_info_style = pdf_styles["train_info"]
+        route_info_style = pdf_styles["route_info"]
         
         story.append(Paragraph(train_data['train_name'], train_info_style))
         
@@ -634,61 +927,27 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             table_headers = ["From Station", "To Station"] + seat_types_with_data
             route_table_data = []
             
-            header_row = []
-            for header in table_headers:
-                header_row.append(Paragraph(header, ParagraphStyle('RouteHeaderStyle',
-                                                                parent=styles['Normal'],
-                                                                fontName=bold_font,
-                                                                fontSize=9,
-                                                                alignment=1,
-                                                                textColor=colors.white)))
+            route_header_style = pdf_styles["route_header"]
+            route_cell_style = pdf_styles["route_cell"]
+            route_count_style = pdf_styles["route_count"]
+            
+            if use_taka_symbol:
+                count_template = f'<font size="8" color="black" face="{regular_font}">{{count}}</font><br/><font size="6" color="gray" face="{bengali_font}">৳</font><font size="6" color="gray" face="{regular_font}"> {{fare:.0f}}</font>'
+            else:
+                count_template = f'<font size="8" color="black" face="{regular_font}">{{count}}</font><br/><font size="6" color="gray" face="{regular_font}">BDT {{fare:.0f}}</font>'
+            
+            header_row = [Paragraph(header, route_header_style) for header in table_headers]
             route_table_data.append(header_row)
             
-            for from_station in stations:
-                for to_station in stations:
-                    if from_station != to_station and from_station in route_summary and to_station in route_summary[from_station]:
-                        has_tickets = any(
-                            route_summary[from_station][to_station][seat_type]["count"] > 0 
-                            for seat_type in seat_types_with_data
-                        )
-                        
-                        if has_tickets:
-                            row = []
-                            row.append(Paragraph(from_station, ParagraphStyle('RouteCellStyle',
-                                                                            parent=styles['Normal'],
-                                                                            fontSize=8,
-                                                                            alignment=1,
-                                                                            fontName=regular_font)))
-                            row.append(Paragraph(to_station, ParagraphStyle('RouteCellStyle',
-                                                                        parent=styles['Normal'],
-                                                                        fontSize=8,
-                                                                        alignment=1,
-                                                                        fontName=regular_font)))
-                            
-                            for seat_type in seat_types_with_data:
-                                count = route_summary[from_station][to_station][seat_type]["count"]
-                                fare = route_summary[from_station][to_station][seat_type]["fare"]
-                                if count > 0:
-                                    if use_taka_symbol:
-                                        count_text = f'<font size="8" color="black" face="{regular_font}">{count}</font><br/><font size="6" color="gray" face="{bengali_font}">৳</font><font size="6" color="gray" face="{regular_font}"> {fare:.0f}</font>'
-                                    else:
-                                        count_text = f'<font size="8" color="black" face="{regular_font}">{count}</font><br/><font size="6" color="gray" face="{regular_font}">BDT {fare:.0f}</font>'
-                                    
-                                    count_style = ParagraphStyle('RouteCountStyle',
-                                                            parent=styles['Normal'],
-                                                            fontSize=8,
-                                                            alignment=1,
-                                                            fontName=regular_font)
-                                else:
-                                    count_text = "—"
-                                    count_style = ParagraphStyle('RouteCountStyle',
-                                                            parent=styles['Normal'],
-                                                            fontSize=8,
-                                                            alignment=1,
-                                                            fontName=regular_font,
-                                                            textColor=colors.gray)
-                                row.append(Paragraph(count_text, count_style))
-                            route_table_data.append(row)
+            for from_station, to_station, counts, fares in route_rows:
+                row = [Paragraph(from_station, route_cell_style), Paragraph(to_station, route_cell_style)]
+                
+                for count, fare in zip(counts, fares):
+                    if count > 0:
+                        row.append(Paragraph(count_template.format(count=count, fare=fare), route_count_style))
+                    else:
+                        row.append("—")
+                route_table_data.append(row)
             
             if len(route_table_data) > 1:
                 num_seat_types = len(seat_types_with_data)
@@ -707,6 +966,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                     ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
                     ('BACKGROUND', (0, 1), (-1, -1), colors.white),
                     ('FONTSIZE', (0, 1), (-1, -1), 8),
+                    ('FONTNAME', (2, 1), (-1, -1), regular_font),
+                    ('TEXTCOLOR', (2, 1), (-1, -1), colors.gray),
                     ('GRID', (0, 0), (-1, -1), 0.5, custom_green),
                     ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, light_green]),
                     ('LEFTPADDING', (0, 0), (-1, -1), 4),
@@ -723,102 +984,64 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         
         story.append(PageBreak())
         
-        for seat_type in seat_types:
-            has_issued_tickets = any(
-                any(len(seats) > 0 for seats in from_routes.values())
-                for from_routes in issued_matrices[seat_type].values()
-            )
-            
-            if has_issued_tickets:
+        matrix_headers = ("From Station", "To Station", "Count", "Seat Numbers")
+        matrix_cell_style = pdf_styles["matrix_cell"]
+        matrix_seat_style = pdf_styles["matrix_seat"]
+        station_text_width = 1.3 * inch - 16
+        matrix_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), custom_green),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (2, -1), 'CENTER'),
+            ('ALIGN', (3, 0), (3, -1), 'LEFT'),
+            ('ALIGN', (3, 0), (3, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), bold_font),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, custom_green),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 1), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+            ('FONTNAME', (0, 1), (-1, -1), regular_font),
+            ('FONTNAME', (2, 1), (2, -1), bold_font),
+            ('FONTSIZE', (0, 1), (2, -1), 9),
+            ('FONTSIZE', (3, 1), (3, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, light_green])
+        ])
+        
+        for seat_type in SEAT_TYPES:
+            if seat_type in issued_rows:
                 matrix_title = f"ISSUED TICKETS — {seat_type}"
                 story.append(Paragraph(matrix_title, matrix_title_style))
                 story.append(Spacer(1, 15))
                 
                 table_data = []
-                headers = ["From Station", "To Station", "Count", "Seat Numbers"]
-                table_data.append([Paragraph(h, ParagraphStyle('HeaderStyle', 
-                                                              parent=styles['Normal'],
-                                                              fontName=bold_font,
-                                                              fontSize=10,
-                                                              alignment=1,
-                                                              textColor=colors.white)) for h in headers])
                 
-                for from_city in stations:
-                    for to_city in stations:
-                        if from_city in issued_matrices[seat_type] and to_city in issued_matrices[seat_type][from_city]:
-                            issued_seats = issued_matrices[seat_type][from_city][to_city]
-                            if issued_seats:
-                                seat_count = len(issued_seats)
-                                seat_lines = format_seat_list(issued_seats, for_pdf=True)
-                                
-                                lines_per_page = 40
-                                
-                                for i in range(0, len(seat_lines), lines_per_page):
-                                    chunk_lines = seat_lines[i:i + lines_per_page]
-                                    seat_str = "\n".join(chunk_lines)
-                                    
-                                    from_para = Paragraph(
-                                        from_city if i == 0 else f"{from_city} (cont.)",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=9,
-                                                       alignment=1,
-                                                       fontName=regular_font)
-                                    )
-                                    to_para = Paragraph(
-                                        to_city if i == 0 else f"{to_city} (cont.)",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=9,
-                                                       alignment=1,
-                                                       fontName=regular_font)
-                                    )
-                                    count_para = Paragraph(
-                                        str(seat_count) if i == 0 else "",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=9,
-                                                       alignment=1,
-                                                       fontName=bold_font)
-                                    )
-                                    seats_para = Paragraph(
-                                        seat_str,
-                                        ParagraphStyle('SeatStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=8,
-                                                       alignment=0,
-                                                       fontName=regular_font,
-                                                       leading=10)
-                                    )
-                                    
-                                    table_data.append([from_para, to_para, count_para, seats_para])
+                for from_city, to_city, issued_seats, seat_lines in issued_rows[seat_type]:
+                    seat_count = len(issued_seats)
+                    
+                    lines_per_page = 40
+                    
+                    for i in range(0, len(seat_lines), lines_per_page):
+                        chunk_lines = seat_lines[i:i + lines_per_page]
+                        seat_str = "\n".join(chunk_lines)
+                        
+                        from_cell = fit_table_cell(from_city if i == 0 else f"{from_city} (cont.)", matrix_cell_style, station_text_width)
+                        to_cell = fit_table_cell(to_city if i == 0 else f"{to_city} (cont.)", matrix_cell_style, station_text_width)
+                        count_cell = str(seat_count) if i == 0 else ""
+                        seats_para = Paragraph(seat_str, matrix_seat_style)
+                        
+                        table_data.append([from_cell, to_cell, count_cell, seats_para])
                 
-                if len(table_data) > 1:
+                if table_data:
                     col_widths = [1.3*inch, 1.3*inch, 0.7*inch, 3.7*inch]
-                    pdf_table = Table(table_data, colWidths=col_widths, repeatRows=1, splitByRow=True)
-                    pdf_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), custom_green),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                        ('ALIGN', (0, 0), (2, -1), 'CENTER'),
-                        ('ALIGN', (3, 0), (3, -1), 'LEFT'),
-                        ('FONTNAME', (0, 0), (-1, 0), bold_font),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                        ('TOPPADDING', (0, 0), (-1, 0), 10),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                        ('GRID', (0, 0), (-1, -1), 1, custom_green),
-                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-                        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-                        ('TOPPADDING', (0, 1), (-1, -1), 6),
-                        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-                        ('FONTNAME', (0, 1), (-1, -1), regular_font),
-                        ('FONTSIZE', (0, 1), (2, -1), 9),
-                        ('FONTSIZE', (3, 1), (3, -1), 8),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, light_green])
-                    ]))
-                    
+                    pdf_table = Table([list(matrix_headers)] + table_data, colWidths=col_widths, repeatRows=1, splitByRow=True)
+                    pdf_table.setStyle(matrix_table_style)
                     story.append(pdf_table)
+                    
                     story.append(Spacer(1, 25))
                 
                 story.append(PageBreak())
@@ -831,6 +1054,89 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         print(f"{Fore.RED}Error generating PDF: {str(e)}")
         print(f"{Fore.YELLOW}Please ensure you have reportlab installed: pip install reportlab")
 
+def collect_issued_tickets(stations: List[str], station_dates: Dict[str, str], train_model: str, seat_types: List[str]) -> Tuple[Dict, Dict, Set[str], int]:
+    issued_matrices = {seat_type: {} for seat_type in seat_types}
+    fare_matrices = {seat_type: {} for seat_type in seat_types}
+    seat_types_with_tickets = set()
+
+    with ThreadPoolExecutor(max_workers=10) as executor, ThreadPoolExecutor(max_workers=20) as layout_executor:
+        route_futures = {}
+        
+        for i, from_city in enumerate(stations):
+            route_date = station_dates[from_city]
+            for to_city in stations[i + 1:]:
+                future = executor.submit(get_route_availability, from_city, to_city, route_date, train_model)
+                route_futures[future] = (from_city, to_city)
+        
+        completed = 0
+        total = len(route_futures)
+        layout_futures = []
+        layout_future_by_trip = {}
+        
+        for future in as_completed(route_futures):
+            from_city, to_city = route_futures[future]
+            route_train_data = future.result()
+            completed += 1
+            
+            if completed % 10 == 0 or completed == total:
+                print(f"Progress: {completed}/{total} combinations processed...")
+            
+            if route_train_data:
+                for seat_type in route_train_data.get("seat_types", []):
+                    seat_type_name = sys.intern(seat_type["type"])
+                    
+                    if seat_type_name in issued_matrices:
+                        fare = float(seat_type["fare"])
+                        vat_amount = float(seat_type["vat_amount"])
+                        if seat_type_name in ["AC_B", "F_BERTH"]:
+                            fare += 50
+                        
+                        if from_city not in fare_matrices[seat_type_name]:
+                            fare_matrices[seat_type_name][from_city] = {}
+                        fare_matrices[seat_type_name][from_city][to_city] = fare + vat_amount
+                        
+                        trip_key = (seat_type["trip_id"], seat_type["trip_route_id"])
+                        layout_future = layout_future_by_trip.get(trip_key)
+                        if layout_future is None:
+                            layout_future = layout_executor.submit(get_seat_layout_for_route, *trip_key)
+                            layout_future_by_trip[trip_key] = layout_future
+                        layout_futures.append((layout_future, seat_type_name, from_city, to_city))
+        
+        failed_layouts = 0
+        for layout_future, seat_type_name, from_city, to_city in layout_futures:
+            issued_info, has_error, error_msg = layout_future.result()
+            
+            if has_error:
+                failed_layouts += 1
+            elif issued_info.get("count", 0) > 0:
+                issued_matrices[seat_type_name].setdefault(from_city, {})[to_city] = issued_info["issued_tickets"]
+                seat_types_with_tickets.add(seat_type_name)
+    
+    return issued_matrices, fare_matrices, seat_types_with_tickets, failed_layouts
+
+def parse_departure_clock(time_str: str) -> Optional[timedelta]:
+    parts = time_str.split()
+    try:
+        departure_clock = datetime.strptime(" ".join(parts[:2]), "%I:%M %p")
+        return timedelta(hours=departure_clock.hour, minutes=departure_clock.minute)
+    except ValueError:
+        pass
+    
+    try:
+        hour, minute = map(int, parts[0].split(':')[:2])
+    except (ValueError, IndexError):
+        return None
+    
+    am_pm = parts[1].lower() if len(parts) > 1 else ""
+    if am_pm == "pm" and hour != 12:
+        hour += 12
+    elif am_pm == "am" and hour == 12:
+        hour = 0
+    
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return timedelta(hours=hour, minutes=minute)
+
 def main():
     print(f"{Fore.CYAN}Bangladesh Railway Issued Tickets Report{Style.RESET_ALL}")
     print("=" * 60)
@@ -860,8 +1166,15 @@ def main():
         print(f"{Fore.RED}Invalid date format in CONFIG. Please use DD-MMM-YYYY format.")
         return
     
-    print(f"\n{Fore.CYAN}Fetching train route information...")
-    train_data = fetch_train_data(train_model, api_date_format)
+    cache_path = get_collection_cache_path(train_model, api_date_format)
+    cached_collection = None if "--refresh" in sys.argv[1:] else load_collection_cache(cache_path)
+    
+    if cached_collection:
+        print(f"\n{Fore.CYAN}Using cached data from {cached_collection['created_at']} (run with --refresh to fetch again)")
+        train_data = cached_collection["train_data"]
+    else:
+        print(f"\n{Fore.CYAN}Fetching train route information...")
+        train_data = fetch_train_data(train_model, api_date_format)
     
     if not train_data:
         print(f"{Fore.RED}No train data found for model {train_model}")
@@ -876,7 +1189,8 @@ def main():
         print(f"{Fore.YELLOW}Please try another date when the train is running.")
         return
     
-    stations = [route['city'] for route in train_data['routes']]
+    stations = [sys.intern(route['city']) for route in train_data['routes']]
+    first_station, last_station = stations[0], stations[-1]
     station_dates = {}
     current_date = date_obj
     previous_time = None
@@ -890,18 +1204,9 @@ def main():
         station = route['city']
         dep_time_str = route.get('departure_time') or route.get('arrival_time')
         
-        if dep_time_str:
-            time_part = dep_time_str.split(' ')[0]
-            am_pm = dep_time_str.split(' ')[1].lower()
-            hour, minute = map(int, time_part.split(':'))
-            
-            if am_pm == "pm" and hour != 12:
-                hour += 12
-            elif am_pm == "am" and hour == 12:
-                hour = 0
-                
-            current_time = timedelta(hours=hour, minutes=minute)
-            
+        current_time = parse_departure_clock(dep_time_str) if dep_time_str else None
+        
+        if current_time is not None:
             if previous_time is not None and current_time < previous_time:
                 current_date += timedelta(days=1)
                 
@@ -916,68 +1221,27 @@ def main():
     seat_types = ["AC_B", "AC_S", "SNIGDHA", "F_BERTH", "F_SEAT", "F_CHAIR",
                   "S_CHAIR", "SHOVAN", "SHULOV", "AC_CHAIR"]
     
-    print(f"\n{Fore.CYAN}Fetching issued tickets data for all route combinations...")
-    print(f"Total combinations to check: {len(stations) * (len(stations) - 1) // 2}")
-    
-    issued_matrices = {seat_type: {} for seat_type in seat_types}
-    fare_matrices = {seat_type: {} for seat_type in seat_types}
-
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = []
-        
-        for i, from_city in enumerate(stations):
-            for j, to_city in enumerate(stations):
-                if i < j:
-                    route_date = station_dates[from_city]
-                    future = executor.submit(get_route_availability, from_city, to_city, route_date, train_model)
-                    futures.append((future, from_city, to_city))
-        
-        completed = 0
-        total = len(futures)
+    if cached_collection:
+        issued_matrices = cached_collection["issued"]
+        fare_matrices = cached_collection["fares"]
+        seat_types_with_tickets = cached_collection["seat_types_with_tickets"]
+    else:
+        print(f"\n{Fore.CYAN}Fetching issued tickets data for all route combinations...")
+        print(f"Total combinations to check: {len(stations) * (len(stations) - 1) // 2}")
         
-        for future, from_city, to_city in futures:
-            route_train_data = future.result()
-            completed += 1
-            
-            if completed % 10 == 0 or completed == total:
-                print(f"Progress: {completed}/{total} combinations processed...")
-            
-            if route_train_data:
-                for seat_type in route_train_data.get("seat_types", []):
-                    seat_type_name = seat_type["type"]
-                    
-                    if seat_type_name in issued_matrices:
-                        fare = float(seat_type["fare"])
-                        vat_amount = float(seat_type["vat_amount"])
-                        if seat_type_name in ["AC_B", "F_BERTH"]:
-                            fare += 50
-                        
-                        if from_city not in fare_matrices[seat_type_name]:
-                            fare_matrices[seat_type_name][from_city] = {}
-                        fare_matrices[seat_type_name][from_city][to_city] = fare + vat_amount
-                        
-                        issued_info, has_error, error_msg = get_seat_layout_for_route(
-                            seat_type["trip_id"], seat_type["trip_route_id"]
-                        )
-                        
-                        if not has_error and issued_info.get("count", 0) > 0:
-                            if from_city not in issued_matrices[seat_type_name]:
-                                issued_matrices[seat_type_name][from_city] = {}
-                            issued_matrices[seat_type_name][from_city][to_city] = issued_info["issued_tickets"]
-                        else:
-                            if from_city not in issued_matrices[seat_type_name]:
-                                issued_matrices[seat_type_name][from_city] = {}
-                            issued_matrices[seat_type_name][from_city][to_city] = []
+        issued_matrices, fare_matrices, seat_types_with_tickets, failed_layouts = collect_issued_tickets(stations, station_dates, train_model, seat_types)
+        if failed_layouts:
+            print(f"{Fore.YELLOW}Warning: {failed_layouts} seat layout request(s) failed. The report may be incomplete and will not be cached.")
+        else:
+            save_collection_cache(cache_path, train_data, issued_matrices, fare_matrices, seat_types_with_tickets)
     
     print(f"\n{Fore.GREEN}Data collection completed!")
     
+    report_data = build_report_data(issued_matrices, fare_matrices, stations, seat_types_with_tickets)
+    issued_rows = report_data["issued_rows"]
+    
     for seat_type in seat_types:
-        has_issued_tickets = any(
-            any(len(seats) > 0 for seats in from_routes.values())
-            for from_routes in issued_matrices[seat_type].values()
-        )
-        
-        if has_issued_tickets:
+        if seat_type in issued_rows:
             print(f"\n{Fore.MAGENTA}{'='*80}")
             print(f"ISSUED TICKETS MATRIX - SEAT TYPE: {seat_type}")
             print(f"{'='*80}{Style.RESET_ALL}")
@@ -985,19 +1249,13 @@ def main():
             table_data = []
             headers = ["From Station", "To Station", "Issued Seats Count", "All Seat Numbers"]
             
-            for from_city in stations:
-                for to_city in stations:
-                    if from_city in issued_matrices[seat_type] and to_city in issued_matrices[seat_type][from_city]:
-                        issued_seats = issued_matrices[seat_type][from_city][to_city]
-                        if issued_seats:
-                            seat_count = len(issued_seats)
-                            seat_display = format_seat_list(issued_seats)
-                            table_data.append([from_city, to_city, seat_count, seat_display])
+            for from_city, to_city, issued_seats, seat_lines in issued_rows[seat_type]:
+                table_data.append([from_city, to_city, len(issued_seats), "\n".join(seat_lines)])
             
             if table_data:
                 print(f"{Fore.CYAN}Total routes with issued tickets: {len(table_data)}")
                 try:
-                    print(tabulate(table_data, headers=headers, tablefmt="grid", maxcolwidths=[15, 15, 10, 60]))
+                    print_grid(table_data, headers, maxcolwidths=[15, 15, 10, 60])
                     print(f"{Fore.GREEN}Table completed successfully for {seat_type}")
                 except Exception as e:
                     print(f"{Fore.RED}Error displaying table for {seat_type}: {str(e)}")
@@ -1011,36 +1269,27 @@ def main():
     print(f"\n{Fore.CYAN}{'='*80}")
     print(f"ROUTE-WISE ISSUED TICKET SUMMARY")
     print(f"Train: {train_data['train_name']}")
-    print(f"Route: {stations[0]} → {stations[-1]}")
+    print(f"Route: {first_station} → {last_station}")
     print(f"{'='*80}{Style.RESET_ALL}")
     
-    route_summary, seat_types_with_data = create_route_summary_data(issued_matrices, fare_matrices, stations)
+    route_rows = report_data["route_rows"]
+    seat_types_with_data = report_data["seat_types_with_data"]
     
     if seat_types_with_data:
         terminal_headers = ["From Station", "To Station"] + seat_types_with_data
         terminal_table_data = []
         
-        for from_station in stations:
-            for to_station in stations:
-                if from_station != to_station and from_station in route_summary:
-                    has_tickets = any(
-                        route_summary[from_station][to_station][seat_type]["count"] > 0 
-                        for seat_type in seat_types_with_data
-                    )
-                    
-                    if has_tickets:
-                        row = [from_station, to_station]
-                        
-                        for seat_type in seat_types_with_data:
-                            count = route_summary[from_station][to_station][seat_type]["count"]
-                            fare = route_summary[from_station][to_station][seat_type]["fare"]
-                            if count > 0:
-                                count_text = f"{count}\n\u09F3 {fare:.0f}"
-                            else:
-                                count_text = "—"
-                            row.append(count_text)
-                        
-                        terminal_table_data.append(row)
+        for from_station, to_station, counts, fares in route_rows:
+            row = [from_station, to_station]
+            
+            for count, fare in zip(counts, fares):
+                if count > 0:
+                    count_text = f"{count}\n\u09F3 {fare:.0f}"
+                else:
+                    count_text = "—"
+                row.append(count_text)
+            
+            terminal_table_data.append(row)
         
         if terminal_table_data:
             try:
@@ -1050,7 +1299,7 @@ def main():
                 
                 maxcolwidths = [max_station_width, max_to_width] + seat_widths
                 
-                print(tabulate(terminal_table_data, headers=terminal_headers, tablefmt="grid", maxcolwidths=maxcolwidths))
+                print_grid(terminal_table_data, terminal_headers, maxcolwidths=maxcolwidths)
                 print(f"{Fore.GREEN}Route summary completed successfully")
             except Exception as e:
                 print(f"{Fore.RED}Error displaying route summary table: {str(e)}")
@@ -1068,21 +1317,16 @@ def main():
     summary_data = []
     summary_headers = ["Seat Type", "Routes with Issued Tickets", "Total Issued Tickets"]
     
+    issued_summary = report_data["issued_summary"]
+    
     for seat_type in seat_types:
-        routes_with_tickets = 0
-        total_tickets = 0
-        
-        for from_routes in issued_matrices[seat_type].values():
-            for seats in from_routes.values():
-                if seats:
-                    routes_with_tickets += 1
-                    total_tickets += len(seats)
+        routes_with_tickets, total_tickets = issued_summary[seat_type]
         
         if routes_with_tickets > 0:
             summary_data.append([seat_type, routes_with_tickets, total_tickets])
     
     if summary_data:
-        print(tabulate(summary_data, headers=summary_headers, tablefmt="grid"))
+        print_grid(summary_data, summary_headers)
     else:
         print(f"{Fore.YELLOW}No issued tickets found for any seat type on any route.")
     
@@ -1090,7 +1334,7 @@ def main():
     print(f"{Fore.CYAN}Total train stations: {len(stations)}")
     print(f"Total route combinations analyzed: {len(stations) * (len(stations) - 1) // 2}")
     
-    generate_pdf_report(issued_matrices, fare_matrices, stations, train_data, CONFIG)
+    generate_pdf_report(issued_matrices, fare_matrices, stations, train_data, CONFIG, report_data)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, abort, send_file
+from flask import Flask, Response, render_template, request, redirect, url_for, session, jsonify, abort, send_file
 from datetime import datetime, timedelta
-import json, pytz, os, re, uuid, base64, requests, logging, sys, threading, time, glob, secrets, time
+import json, pytz, os, re, base64, requests, logging, sys, threading, time
 from reportGenerator import generate_report
 from request_queue import RequestQueue
-from functools import wraps
+from functools import wraps, lru_cache
+from collections import OrderedDict
+from itertools import chain
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
+class OrjsonProvider(DefaultJSONProvider):
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson:
+    app.json = OrjsonProvider(app)
 app.secret_key = "super_secret_key"
 
 logging.basicConfig(
@@ -17,17 +42,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-RESULT_CACHE = {}
+class ResultCache:
+    def __init__(self, maxsize=1024, ttl=1800):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+        if entry is None or entry[0] < time.time():
+            return default
+        return entry[1]
+
+    def purge_expired(self):
+        now = time.time()
+        with self.lock:
+            expired_keys = [key for key, (expires_at, _) in self.entries.items() if expires_at < now]
+            for key in expired_keys:
+                del self.entries[key]
+        return len(expired_keys)
+
+API_SESSION = requests.Session()
+API_SESSION.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+HOME_PAGE_CACHE = {'entry': (None, None)}
+NOT_FOUND_PAGE_CACHE = {'html': None}
 
 @app.before_request
 def redirect_to_new_site():
     return redirect('https://trainseat.onrender.com/sunset', code=302)
 
-class SecurityConfig:
-    @staticmethod
-    def generate_session_token():
-        return secrets.token_urlsafe(32)
-
 def require_valid_session(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -47,94 +99,119 @@ def require_valid_session(f):
         return f(*args, **kwargs)
     return decorated_function
 
+MOBILE_UA_RE = re.compile(r'mobile|android|iphone|ipad|tablet', re.IGNORECASE)
+EDGE_OPERA_UA_RE = re.compile(r'edge|opr|opera', re.IGNORECASE)
+BROWSER_UA_RE = re.compile(r'chrome|firefox|safari|msie|trident', re.IGNORECASE)
+TRAIN_MODEL_RE = re.compile(r'\((\d+)\)$')
+DEPARTURE_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})\s*([ap])m\s*$', re.IGNORECASE)
+BROWSER_NAMES = {
+    'edge': 'Edge',
+    'opr': 'Opera',
+    'opera': 'Opera',
+    'chrome': 'Chrome',
+    'firefox': 'Firefox',
+    'safari': 'Safari',
+    'msie': 'Internet Explorer',
+    'trident': 'Internet Explorer'
+}
+
 def get_user_device_info():
     user_agent = request.headers.get('User-Agent', '')
     
-    if any(mobile in user_agent.lower() for mobile in ['mobile', 'android', 'iphone', 'ipad', 'tablet']):
-        device_type = 'Mobile'
-    else:
-        device_type = 'PC'
-    
-    browser = 'Unknown'
-    user_agent_lower = user_agent.lower()
-    
-    if 'chrome' in user_agent_lower and 'edge' not in user_agent_lower and 'opr' not in user_agent_lower:
-        browser = 'Chrome'
-    elif 'firefox' in user_agent_lower:
-        browser = 'Firefox'
-    elif 'safari' in user_agent_lower and 'chrome' not in user_agent_lower:
-        browser = 'Safari'
-    elif 'edge' in user_agent_lower:
-        browser = 'Edge'
-    elif 'opera' in user_agent_lower or 'opr' in user_agent_lower:
-        browser = 'Opera'
-    elif 'msie' in user_agent_lower or 'trident' in user_agent_lower:
-        browser = 'Internet Explorer'
+    device_type = 'Mobile' if MOBILE_UA_RE.search(user_agent) else 'PC'
+    
+    match = EDGE_OPERA_UA_RE.search(user_agent) or BROWSER_UA_RE.search(user_agent)
+    browser = BROWSER_NAMES[match.group().lower()] if match else 'Unknown'
     
     return device_type, browser
 
-with open('config.json', 'r', encoding='utf-8') as config_file:
-    CONFIG = json.load(config_file)
+with open('config.json', 'rb') as config_file:
+    CONFIG = json_loads(config_file.read())
+
+APP_VERSION = CONFIG.get("version", "1.0.0")
+
+RESULT_CACHE = ResultCache(
+    maxsize=CONFIG.get("result_cache_size", 1024),
+    ttl=CONFIG.get("result_cache_ttl", 1800)
+)
+MAX_VIEWED_REQUESTS = 20
 
 PDF_CLEANUP_ENABLED = True
 PDF_MAX_AGE_MINUTES = 30
 PDF_CLEANUP_INTERVAL_MINUTES = 10
-PDF_CLEANUP_BATCH_SIZE = 50
 
 class PDFCleanupManager:
     
     def __init__(self):
         self.cleanup_running = False
+        self.cleanup_lock = threading.Lock()
+        self.cleanup_started_pid = None
         self.last_cleanup = datetime.now()
+        self.tracked_pdfs = {}
+        self.tracked_lock = threading.Lock()
         self.stats = {
             'total_cleaned': 0,
             'cleanup_cycles': 0,
             'last_cleanup_time': None,
             'files_failed_to_delete': 0
         }
+        self.adopt_existing_pdfs()
+    
+    def adopt_existing_pdfs(self):
+        try:
+            with os.scandir('.') as entries:
+                existing = {}
+                for entry in entries:
+                    if not entry.name.endswith('.pdf'):
+                        continue
+                    try:
+                        existing[entry.name] = entry.stat().st_mtime
+                    except OSError:
+                        continue
+        except OSError:
+            return
+        with self.tracked_lock:
+            self.tracked_pdfs.update(existing)
+    
+    def track(self, pdf_filename):
+        if pdf_filename:
+            with self.tracked_lock:
+                self.tracked_pdfs[pdf_filename] = time.time()
+    
+    def untrack(self, pdf_filename):
+        with self.tracked_lock:
+            self.tracked_pdfs.pop(pdf_filename, None)
     
     def cleanup_old_pdfs(self):
         if not PDF_CLEANUP_ENABLED:
             return
         
-        if self.cleanup_running:
+        if not self.cleanup_lock.acquire(blocking=False):
             return
         
         self.cleanup_running = True
         try:
-            pdf_files = glob.glob("*.pdf")
-            
-            if not pdf_files:
-                return
-            
             current_time = datetime.now()
-            cutoff_time = current_time - timedelta(minutes=PDF_MAX_AGE_MINUTES)
+            cutoff_timestamp = time.time() - PDF_MAX_AGE_MINUTES * 60
             
-            files_to_delete = []
-            files_processed = 0
-            
-            for pdf_file in pdf_files[:PDF_CLEANUP_BATCH_SIZE]:
-                try:
-                    file_stat = os.stat(pdf_file)
-                    file_modified_time = datetime.fromtimestamp(file_stat.st_mtime)
-                    
-                    if file_modified_time < cutoff_time:
-                        files_to_delete.append((pdf_file, file_modified_time))
-                    
-                    files_processed += 1
-                except Exception:
-                    continue
+            with self.tracked_lock:
+                if not self.tracked_pdfs:
+                    return
+                files_to_delete = [name for name, created_at in self.tracked_pdfs.items() if created_at < cutoff_timestamp]
             
             deleted_count = 0
             failed_count = 0
             
-            for pdf_file, file_time in files_to_delete:
+            for pdf_file in files_to_delete:
                 try:
                     os.remove(pdf_file)
                     deleted_count += 1
+                except FileNotFoundError:
+                    pass
                 except Exception:
                     failed_count += 1
                     continue
+                self.untrack(pdf_file)
             
             self.stats['total_cleaned'] += deleted_count
             self.stats['cleanup_cycles'] += 1
@@ -146,16 +223,22 @@ class PDFCleanupManager:
             pass
         finally:
             self.cleanup_running = False
+            self.cleanup_lock.release()
     
     def start_background_cleanup(self):
         if not PDF_CLEANUP_ENABLED:
             return
         
+        if self.cleanup_started_pid == os.getpid():
+            return
+        self.cleanup_started_pid = os.getpid()
+        
         def cleanup_worker():
             while PDF_CLEANUP_ENABLED:
                 try:
                     time.sleep(PDF_CLEANUP_INTERVAL_MINUTES * 60)
                     self.cleanup_old_pdfs()
+                    RESULT_CACHE.purge_expired()
                 except Exception:
                     time.sleep(60)
         
@@ -166,41 +249,21 @@ class PDFCleanupManager:
         return self.stats.copy()
 
 pdf_cleanup_manager = PDFCleanupManager()
+cleanup_executor = ThreadPoolExecutor(max_workers=1)
 
-with open('static/js/script.js', 'r', encoding='utf-8') as js_file:
-    SCRIPT_JS_CONTENT = js_file.read()
-with open('static/css/styles.css', 'r', encoding='utf-8') as css_file:
-    STYLES_CSS_CONTENT = css_file.read()
-
-default_banner_path = 'static/images/sample_banner.png'
-DEFAULT_BANNER_IMAGE = ""
-if os.path.exists(default_banner_path):
+def load_data_uri(path, mime_type='image/png'):
     try:
-        with open(default_banner_path, 'rb') as img_file:
-            encoded_image = base64.b64encode(img_file.read()).decode('utf-8')
-            DEFAULT_BANNER_IMAGE = f"data:image/png;base64,{encoded_image}"
-    except Exception:
-        pass
-
-instruction_image_path = 'static/images/instruction.png'
-DEFAULT_INSTRUCTION_IMAGE = ""
-if os.path.exists(instruction_image_path):
-    try:
-        with open(instruction_image_path, 'rb') as img_file:
-            encoded_image = base64.b64encode(img_file.read()).decode('utf-8')
-            DEFAULT_INSTRUCTION_IMAGE = f"data:image/png;base64,{encoded_image}"
-    except Exception:
-        pass
-
-mobile_instruction_image_path = 'static/images/mobile_instruction.png'
-DEFAULT_MOBILE_INSTRUCTION_IMAGE = ""
-if os.path.exists(mobile_instruction_image_path):
-    try:
-        with open(mobile_instruction_image_path, 'rb') as img_file:
-            encoded_image = base64.b64encode(img_file.read()).decode('utf-8')
-            DEFAULT_MOBILE_INSTRUCTION_IMAGE = f"data:image/png;base64,{encoded_image}"
-    except Exception:
-        pass
+        with open(path, 'rb') as img_file:
+            return f"data:{mime_type};base64,{base64.b64encode(img_file.read()).decode('ascii')}"
+    except OSError:
+        return ""
+
+with ThreadPoolExecutor(max_workers=3) as asset_executor:
+    DEFAULT_BANNER_IMAGE, DEFAULT_INSTRUCTION_IMAGE, DEFAULT_MOBILE_INSTRUCTION_IMAGE = asset_executor.map(load_data_uri, [
+        'static/images/sample_banner.png',
+        'static/images/instruction.png',
+        'static/images/mobile_instruction.png'
+    ])
 
 def configure_request_queue():
     max_concurrent = CONFIG.get("queue_max_concurrent", 1)
@@ -219,22 +282,20 @@ def configure_request_queue():
 
 request_queue = configure_request_queue()
 
-with open('trains_en.json', 'r') as f:
-    trains_data = json.load(f)
+with open('trains_en.json', 'rb') as f:
+    trains_data = json_loads(f.read())
     trains_full = trains_data['trains']
     trains = [train['train_name'] for train in trains_data['trains']]
 
-with open('stations_en.json', 'r') as f:
-    stations_data = json.load(f)
+with open('stations_en.json', 'rb') as f:
+    stations_data = json_loads(f.read())
     stations = stations_data['stations']
 
 def check_maintenance():
     if CONFIG.get("is_maintenance", 0):
         return render_template(
             'notice.html',
-            message=CONFIG.get("maintenance_message", ""),
-            styles_css=STYLES_CSS_CONTENT,
-            script_js=SCRIPT_JS_CONTENT
+            message=CONFIG.get("maintenance_message", "")
         )
     return None
 
@@ -243,21 +304,48 @@ def block_cloudflare_noise():
     if request.path.startswith('/cdn-cgi/'):
         return '', 404
 
+REVALIDATED_PATH_PREFIXES = ('/queue_status/', '/queue_stats')
+SHORT_CACHE_PATHS = ('/pdf_list', '/pdf_cleanup_stats')
+
+@app.context_processor
+def inject_app_version():
+    return {'app_version': APP_VERSION}
+
 @app.after_request
 def set_cache_headers(response):
+    if request.path.startswith('/static/'):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    if request.path.startswith(REVALIDATED_PATH_PREFIXES):
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    if request.path in SHORT_CACHE_PATHS:
+        response.headers['Cache-Control'] = 'private, max-age=5'
+        return response
     response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
     return response
 
+ADS_TXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ads.txt')
+
 @app.route('/ads.txt')
 def ads_txt():
     try:
-        ads_txt_path = os.path.join(os.path.dirname(__file__), 'ads.txt')
-        return send_file(ads_txt_path, mimetype='text/plain')
+        return send_file(ADS_TXT_PATH, mimetype='text/plain')
     except FileNotFoundError:
         abort(404)
 
+BST_TZ = pytz.timezone('Asia/Dhaka')
+
+@lru_cache(maxsize=2)
+def get_booking_window(epoch_minute):
+    bst_now = datetime.fromtimestamp(epoch_minute * 60, BST_TZ)
+    min_date = bst_now.replace(hour=0, minute=0, second=0, microsecond=0)+timedelta(days=1)
+    max_date = min_date + timedelta(days=10)
+    bst_midnight_utc = min_date.astimezone(pytz.UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return min_date.strftime("%Y-%m-%d"), max_date.strftime("%Y-%m-%d"), bst_midnight_utc
+
 @app.route('/')
 def home():
     maintenance_response = check_maintenance()
@@ -266,18 +354,13 @@ def home():
 
     error = session.pop('error', None)
 
-    app_version = CONFIG.get("version", "1.0.0")
-    config = CONFIG.copy()
+    app_version = APP_VERSION
     
     banner_image = CONFIG.get("image_link") or DEFAULT_BANNER_IMAGE
     if not banner_image:
         banner_image = ""
 
-    bst_tz = pytz.timezone('Asia/Dhaka')
-    bst_now = datetime.now(bst_tz)
-    min_date = bst_now.replace(hour=0, minute=0, second=0, microsecond=0)+timedelta(days=1)
-    max_date = min_date + timedelta(days=10)
-    bst_midnight_utc = min_date.astimezone(pytz.UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
+    min_date_str, max_date_str, bst_midnight_utc = get_booking_window(int(time.time() // 60))
 
     if request.method == 'GET' and not session.get('form_submitted', False):
         session.pop('form_values', None)
@@ -289,27 +372,36 @@ def home():
     if not form_values:
         form_values = None
 
-    return render_template(
+    cache_key = (app_version, min_date_str, banner_image)
+    is_cacheable = not error and not form_values
+    if is_cacheable:
+        cached_key, cached_html = HOME_PAGE_CACHE['entry']
+        if cached_key == cache_key:
+            return cached_html
+
+    html = render_template(
         'index.html',
         error=error,
         app_version=app_version,
-        CONFIG=config,
+        CONFIG=CONFIG,
         is_banner_enabled=CONFIG.get("is_banner_enabled", 0),
         banner_image=banner_image,
         instruction_image=DEFAULT_INSTRUCTION_IMAGE,
         mobile_instruction_image=DEFAULT_MOBILE_INSTRUCTION_IMAGE,
-        min_date=min_date.strftime("%Y-%m-%d"),
-        max_date=max_date.strftime("%Y-%m-%d"),
+        min_date=min_date_str,
+        max_date=max_date_str,
         bst_midnight_utc=bst_midnight_utc,
         show_disclaimer=True,
         form_values=form_values,
         trains=trains,
         trains_full=trains_full,
-        stations=stations,
-        styles_css=STYLES_CSS_CONTENT,
-        script_js=SCRIPT_JS_CONTENT
+        stations=stations
     )
 
+    if is_cacheable:
+        HOME_PAGE_CACHE['entry'] = (cache_key, html)
+    return html
+
 @app.route('/report_result')
 def report_result():
     maintenance_response = check_maintenance()
@@ -334,9 +426,7 @@ def report_result():
     return render_template(
         'report.html',
         report_data=result,
-        form_values=form_values,
-        styles_css=STYLES_CSS_CONTENT,
-        script_js=SCRIPT_JS_CONTENT
+        form_values=form_values
     )
 
 def process_report_request(train_model, journey_date_str, api_date_format, form_values, auth_token, device_key):
@@ -350,6 +440,7 @@ def process_report_request(train_model, journey_date_str, api_date_format, form_
             return {"error": error_msg}
         
         pdf_filename = result.get('filename')
+        pdf_cleanup_manager.track(pdf_filename)
         return {"success": True, "result": result, "form_values": form_values, "pdf_filename": pdf_filename}
     except Exception as e:
         return {"error": str(e)}
@@ -382,9 +473,7 @@ def queue_wait():
         'queue.html',
         request_id=request_id,
         status=status, 
-        form_values=form_values,
-        styles_css=STYLES_CSS_CONTENT,
-        script_js=SCRIPT_JS_CONTENT
+        form_values=form_values
     )
 
 @app.route('/queue_status/<request_id>')
@@ -398,7 +487,9 @@ def queue_status(request_id):
         if result and "error" in result:
             status["errorMessage"] = result["error"]
     
-    return jsonify(status)
+    response = jsonify(status)
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route('/cancel_request/<request_id>', methods=['POST'])
 def cancel_request(request_id):
@@ -476,9 +567,7 @@ def show_results_with_id(request_id):
     if session.get('queue_request_id') == request_id:
         session.pop('queue_request_id', None)
     
-    if 'viewed_requests' not in session:
-        session['viewed_requests'] = []
-    session['viewed_requests'].append(request_id)
+    session['viewed_requests'] = (viewed_requests + [request_id])[-MAX_VIEWED_REQUESTS:]
     
     session['form_values'] = form_values
     session['pdf_filename'] = pdf_filename
@@ -487,9 +576,7 @@ def show_results_with_id(request_id):
     return render_template(
         'report.html',
         report_data=result,
-        form_values=form_values,
-        styles_css=STYLES_CSS_CONTENT,
-        script_js=SCRIPT_JS_CONTENT
+        form_values=form_values
     )
 
 @app.route('/report', methods=['GET', 'POST'])
@@ -520,9 +607,7 @@ def report():
         
         return render_template(
             'report.html',
-            form_values=form_values,
-            styles_css=STYLES_CSS_CONTENT,
-            script_js=SCRIPT_JS_CONTENT
+            form_values=form_values
         )
 
     train_model_full = request.form.get('train_model', '').strip()
@@ -542,7 +627,7 @@ def report():
         session['error'] = "Invalid date format. Use DD-MMM-YYYY (e.g. 15-Nov-2024)."
         return redirect(url_for('home'))
 
-    model_match = re.match(r'.*\((\d+)\)$', train_model_full)
+    model_match = TRAIN_MODEL_RE.search(train_model_full)
     if model_match:
         train_model = model_match.group(1)
     else:
@@ -582,8 +667,8 @@ def report():
                 session['error'] = result["error"]
                 return redirect(url_for('home'))
             
-            result_id = str(uuid.uuid4())
-            RESULT_CACHE[result_id] = result["result"]
+            result_id = os.urandom(16).hex()
+            RESULT_CACHE.set(result_id, result["result"])
             session['result_id'] = result_id
             session['pdf_filename'] = result.get("pdf_filename")
             return redirect(url_for('report_result'))
@@ -629,7 +714,7 @@ def generate_report_api():
                 "error": "Request data doesn't match your session. Please start over."
             }), 403
         
-        model_match = re.match(r'.*\((\d+)\)$', train_model)
+        model_match = TRAIN_MODEL_RE.search(train_model)
         if model_match:
             train_number = model_match.group(1)
         else:
@@ -646,6 +731,7 @@ def generate_report_api():
         result = generate_report(train_number, api_date_format)
         
         if result['success']:
+            pdf_cleanup_manager.track(result['filename'])
             session['pdf_filename'] = result['filename']
             return jsonify({
                 "success": True,
@@ -687,22 +773,23 @@ def download_report(filename):
                 return redirect(url_for('report'))
         
         file_path = filename
-        if not os.path.exists(file_path):
+        device_type, browser = get_user_device_info()
+        
+        try:
+            response = send_file(
+                file_path,
+                as_attachment=True,
+                download_name=filename,
+                mimetype='application/pdf'
+            )
+        except FileNotFoundError:
+            pdf_cleanup_manager.untrack(file_path)
             if not session.get('form_values'):
                 abort(404)
             else:
                 session['error'] = "Report file not found or has expired. Please generate a new report."
                 return redirect(url_for('home'))
         
-        device_type, browser = get_user_device_info()
-        
-        response = send_file(
-            file_path,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
-        
         response.headers['X-Content-Type-Options'] = 'nosniff'
         response.headers['X-Frame-Options'] = 'DENY'
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
@@ -710,8 +797,11 @@ def download_report(filename):
         @response.call_on_close
         def remove_file():
             try:
-                if os.path.exists(file_path):
+                try:
                     os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                pdf_cleanup_manager.untrack(file_path)
                 session.pop('pdf_filename', None)
             except Exception:
                 pass
@@ -729,7 +819,9 @@ def download_report(filename):
 def queue_stats():
     try:
         stats = request_queue.get_queue_stats()
-        return jsonify(stats)
+        response = jsonify(stats)
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -774,8 +866,11 @@ def search_trains():
         date1_str = date1.strftime('%d-%b-%Y')
         date2_str = date2.strftime('%d-%b-%Y')
         
-        trains_day1 = fetch_trains_for_date(origin, destination, date1_str, auth_token, device_key)
-        trains_day2 = fetch_trains_for_date(origin, destination, date2_str, auth_token, device_key)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            day1_future = executor.submit(fetch_trains_for_date, origin, destination, date1_str, auth_token, device_key)
+            day2_future = executor.submit(fetch_trains_for_date, origin, destination, date2_str, auth_token, device_key)
+            trains_day1 = day1_future.result()
+            trains_day2 = day2_future.result()
         
         common_trains = get_common_trains(trains_day1, trains_day2)
         
@@ -806,7 +901,7 @@ def fetch_trains_for_date(origin, destination, date_str, auth_token, device_key)
     
     while retry_count < max_retries:
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = API_SESSION.get(url, headers=headers, params=params, timeout=10)
             
             if response.status_code == 429:
                 try:
@@ -884,125 +979,142 @@ def fetch_trains_for_date(origin, destination, date_str, auth_token, device_key)
     return []
 
 def get_common_trains(trains_day1, trains_day2):
-    all_trains = {}
-    
-    for train in trains_day1:
-        trip_number = train.get('trip_number', '')
-        if trip_number and trip_number not in all_trains:
-            all_trains[trip_number] = {
-                'trip_number': trip_number,
-                'departure_time': train.get('departure_date_time', ''),
-                'arrival_time': train.get('arrival_date_time', ''),
-                'travel_time': train.get('travel_time', ''),
-                'origin_city': train.get('origin_city_name', ''),
-                'destination_city': train.get('destination_city_name', ''),
-                'sort_time': extract_time_for_sorting(train.get('departure_date_time', ''))
-            }
+    merged_trains = {}
+    for train in chain(trains_day1, trains_day2):
+        trip_number = train.get('trip_number')
+        if trip_number:
+            merged_trains.setdefault(trip_number, train)
     
-    for train in trains_day2:
-        trip_number = train.get('trip_number', '')
-        if trip_number and trip_number not in all_trains:
-            all_trains[trip_number] = {
-                'trip_number': trip_number,
-                'departure_time': train.get('departure_date_time', ''),
-                'arrival_time': train.get('arrival_date_time', ''),
-                'travel_time': train.get('travel_time', ''),
-                'origin_city': train.get('origin_city_name', ''),
-                'destination_city': train.get('destination_city_name', ''),
-                'sort_time': extract_time_for_sorting(train.get('departure_date_time', ''))
-            }
+    keyed_trains = [
+        (extract_time_for_sorting(train.get('departure_date_time') or ''), trip_number, train)
+        for trip_number, train in merged_trains.items()
+    ]
+    keyed_trains.sort(key=itemgetter(0))
     
-    trains_list = list(all_trains.values())
-    trains_list.sort(key=lambda x: x.get('sort_time', ''))
+    return [
+        {
+            'trip_number': trip_number,
+            'departure_time': train.get('departure_date_time', ''),
+            'arrival_time': train.get('arrival_date_time', ''),
+            'travel_time': train.get('travel_time', ''),
+            'origin_city': train.get('origin_city_name', ''),
+            'destination_city': train.get('destination_city_name', '')
+        }
+        for _, trip_number, train in keyed_trains
+    ]
+
+@lru_cache(maxsize=4096)
+def extract_time_for_sorting(departure_time_str):
+    time_match = DEPARTURE_TIME_RE.search(departure_time_str)
+    if not time_match:
+        return 9999
     
-    for train in trains_list:
-        train.pop('sort_time', None)
+    hour = int(time_match.group(1)) % 12
+    if time_match.group(3) in ('p', 'P'):
+        hour += 12
     
-    return trains_list
+    return hour * 60 + int(time_match.group(2))
 
-def extract_time_for_sorting(departure_time_str):
-    try:
-        if not departure_time_str:
-            return "99:99"
-            
-        time_part = departure_time_str.split(',')[-1].strip()
-        
-        if 'am' in time_part.lower():
-            time_clean = time_part.lower().replace('am', '').strip()
-            hour, minute = time_clean.split(':')
-            hour = int(hour)
-            if hour == 12:
-                hour = 0
-        elif 'pm' in time_part.lower():
-            time_clean = time_part.lower().replace('pm', '').strip()
-            hour, minute = time_clean.split(':')
-            hour = int(hour)
-            if hour != 12:
-                hour += 12
-        else:
-            return "99:99"
-            
-        return f"{hour:02d}:{minute}"
-        
-    except Exception:
-        return "99:99"
+PROBE_PATH_PREFIXES = ('/.', '/wp-', '/xmlrpc')
 
 @app.errorhandler(404)
 def page_not_found(e):
-    maintenance_response = check_maintenance()
-    if maintenance_response:
-        return maintenance_response
-    return render_template('404.html', styles_css=STYLES_CSS_CONTENT, script_js=SCRIPT_JS_CONTENT), 404
+    if len(request.path) <= 128 and not request.path.startswith(PROBE_PATH_PREFIXES):
+        maintenance_response = check_maintenance()
+        if maintenance_response:
+            return maintenance_response
+    if NOT_FOUND_PAGE_CACHE['html'] is None:
+        NOT_FOUND_PAGE_CACHE['html'] = render_template('404.html')
+    return NOT_FOUND_PAGE_CACHE['html'], 404
 
 @app.route('/pdf_cleanup_stats')
 def pdf_cleanup_stats():
     try:
         stats = pdf_cleanup_manager.get_cleanup_stats()
-        return jsonify({
+        response = jsonify({
             "success": True,
             "cleanup_enabled": PDF_CLEANUP_ENABLED,
             "max_age_minutes": PDF_MAX_AGE_MINUTES,
             "cleanup_interval_minutes": PDF_CLEANUP_INTERVAL_MINUTES,
             "stats": stats
         })
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/pdf_cleanup_manual', methods=['POST'])
 def pdf_cleanup_manual():
     try:
-        pdf_cleanup_manager.cleanup_old_pdfs()
+        cleanup_executor.submit(pdf_cleanup_manager.cleanup_old_pdfs)
         stats = pdf_cleanup_manager.get_cleanup_stats()
         return jsonify({
             "success": True,
-            "message": "Manual cleanup completed",
+            "message": "Manual cleanup scheduled",
             "stats": stats
-        })
+        }), 202
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+FILE_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def iter_pdf_files(now_ts):
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pdf'):
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                file_stat = entry.stat()
+            except OSError:
+                continue
+            yield {
+                "filename": entry.name,
+                "size": file_stat.st_size,
+                "created": time.strftime(FILE_TIMESTAMP_FORMAT, time.localtime(file_stat.st_ctime)),
+                "modified": time.strftime(FILE_TIMESTAMP_FORMAT, time.localtime(file_stat.st_mtime)),
+                "age_minutes": (now_ts - file_stat.st_mtime) / 60
+            }
+
+def get_newest_pdf_mtime_ns():
+    newest_mtime_ns = 0
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pdf'):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    newest_mtime_ns = max(newest_mtime_ns, entry.stat().st_mtime_ns)
+            except OSError:
+                continue
+    return newest_mtime_ns
+
 @app.route('/pdf_list')
 def pdf_list():
     try:
-        pdf_files = []
-        for pdf_file in glob.glob("*.pdf"):
-            try:
-                file_stat = os.stat(pdf_file)
-                pdf_files.append({
-                    "filename": pdf_file,
-                    "size": file_stat.st_size,
-                    "created": datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
-                    "modified": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                    "age_minutes": (datetime.now() - datetime.fromtimestamp(file_stat.st_mtime)).total_seconds() / 60
-                })
-            except Exception:
-                continue
+        now_ts = time.time()
+        stream = request.args.get('stream') == '1'
+        etag = f"{os.stat('.').st_mtime_ns:x}-{get_newest_pdf_mtime_ns():x}-{int(now_ts // 60):x}-{'ndjson' if stream else 'json'}"
+        if request.if_none_match.contains(etag):
+            return '', 304, {'ETag': f'"{etag}"'}
         
-        return jsonify({
+        if stream:
+            response = Response(
+                (app.json.dumps(pdf_file) + '\n' for pdf_file in iter_pdf_files(now_ts)),
+                mimetype='application/x-ndjson'
+            )
+            response.set_etag(etag)
+            return response
+        
+        pdf_files = list(iter_pdf_files(now_ts))
+        response = jsonify({
             "success": True,
             "total_files": len(pdf_files),
             "files": pdf_files
         })
+        response.set_etag(etag)
+        return response
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
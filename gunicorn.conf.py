@@ -0,0 +1,10 @@
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5003)}"
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+keepalive = 15
+timeout = 120
+loglevel = 'info'
+accesslog = '-'
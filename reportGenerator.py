@@ -1,7 +1,15 @@
-import requests, os, textwrap, json, pytz
+import requests, os, json, pytz, threading, time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Tuple
 from datetime import datetime, timedelta, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial, wraps
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
 try:
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
@@ -17,6 +25,16 @@ except ImportError:
     REPORTLAB_AVAILABLE = False
 
 API_BASE_URL = 'https://railspaapi.shohoz.com/v1.0'
+ASIA_DHAKA = pytz.timezone('Asia/Dhaka')
+SESSION = requests.Session()
+HTTP_RETRY = Retry(
+    total=1,
+    backoff_factor=0.3,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(('GET', 'POST')),
+    raise_on_status=False
+)
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=HTTP_RETRY))
 SEAT_AVAILABILITY = {'AVAILABLE': 1, 'IN_PROCESS': 2}
 
 BANGLA_COACH_ORDER = [
@@ -24,21 +42,70 @@ BANGLA_COACH_ORDER = [
     "TA", "THA", "DA", "DHA", "TO", "THO", "DOA", "DANT", "XTR1", "XTR2", 
     "XTR3", "XTR4", "XTR5", "SLR", "STD"
 ]
-COACH_INDEX = {coach: idx for idx, coach in enumerate(BANGLA_COACH_ORDER)}
+COACH_KEY = {coach: (idx, "") for idx, coach in enumerate(BANGLA_COACH_ORDER)}
+UNKNOWN_COACH_ORDER = len(BANGLA_COACH_ORDER) + 1
+ISSUED_TICKET_TYPES = frozenset((1, 3))
+SEAT_TYPES = ("S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR")
 
 TOKEN = None
 TOKEN_TIMESTAMP = None
 
+API_CACHE_MAX_ENTRIES = 2048
+
+def ttl_memoize(ttl: float, negative_ttl: float):
+    def decorator(func):
+        cache = {}
+        pending = {}
+        cache_lock = threading.Lock()
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = args + tuple(sorted(kwargs.items())) if kwargs else args
+            with cache_lock:
+                entry = cache.get(key)
+                if entry and entry[0] > time.monotonic():
+                    return entry[1]
+                future = pending.get(key)
+                is_owner = future is None
+                if is_owner:
+                    future = pending[key] = Future()
+            
+            if not is_owner:
+                return future.result()
+            
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                with cache_lock:
+                    pending.pop(key, None)
+                future.set_exception(e)
+                raise
+            
+            now = time.monotonic()
+            expires_at = now + (ttl if result else negative_ttl)
+            with cache_lock:
+                if len(cache) >= API_CACHE_MAX_ENTRIES:
+                    for stale_key in [stale_key for stale_key, (entry_expiry, _) in cache.items() if entry_expiry <= now]:
+                        del cache[stale_key]
+                    if len(cache) >= API_CACHE_MAX_ENTRIES:
+                        cache.clear()
+                cache[key] = (expires_at, result)
+                pending.pop(key, None)
+            future.set_result(result)
+            return result
+        return wrapper
+    return decorator
+
 def set_token(token: str):
     global TOKEN, TOKEN_TIMESTAMP
     TOKEN = token
     TOKEN_TIMESTAMP = datetime.now(timezone.utc)
 
+@lru_cache(maxsize=8192)
 def sort_seat_number(seat: str) -> tuple:
     parts = seat.split('-')
     coach = parts[0]
-    coach_order = COACH_INDEX.get(coach, len(BANGLA_COACH_ORDER) + 1)
-    coach_fallback = coach if coach not in COACH_INDEX else ""
+    coach_order, coach_fallback = COACH_KEY.get(coach) or (UNKNOWN_COACH_ORDER, coach)
     
     if len(parts) == 2:
         try:
@@ -51,26 +118,26 @@ def sort_seat_number(seat: str) -> tuple:
         except ValueError:
             return (coach_order, coach_fallback, 0, parts[1])
     
-    return (len(BANGLA_COACH_ORDER) + 1, seat, 0, '')
+    return (UNKNOWN_COACH_ORDER, seat, 0, '')
 
 def analyze_issued_tickets(data: Dict, auth_token: str, device_key: str) -> Dict:
     layout = data.get("data", {}).get("seatLayout", [])
     if not layout:
         return {}
     
-    issued_seats = []
+    issued_seats = [
+        seat_number
+        for floor in layout
+        for row in floor["layout"]
+        for seat in row
+        if seat["ticket_type"] in ISSUED_TICKET_TYPES and (seat_number := seat["seat_number"])
+    ]
     
-    for floor in layout:
-        for row in floor["layout"]:
-            for seat in row:
-                if seat["seat_number"] and seat["ticket_type"] in [1, 3]:
-                    issued_seats.append(seat["seat_number"])
-    
-    issued_seats_sorted = sorted(issued_seats, key=sort_seat_number)
+    issued_seats.sort(key=sort_seat_number)
     
     return {
-        "issued_tickets": issued_seats_sorted,
-        "count": len(issued_seats_sorted)
+        "issued_tickets": issued_seats,
+        "count": len(issued_seats)
     }
 
 def get_seat_layout_for_route(trip_id: str, trip_route_id: str, auth_token: str, device_key: str) -> Tuple[Dict, bool, str]:
@@ -81,86 +148,51 @@ def get_seat_layout_for_route(trip_id: str, trip_route_id: str, auth_token: str,
     }
     params = {"trip_id": trip_id, "trip_route_id": trip_route_id}
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code == 429:
-                try:
-                    error_data = response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list) and error_messages:
-                        return {}, True, error_messages[0]
-                    return {}, True, "Too many requests. Please slow down."
-                except ValueError:
-                    return {}, True, "Too many requests. Please slow down."
-            
-            if response.status_code == 401:
-                try:
-                    error_data = response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list):
-                        for msg in error_messages:
-                            if "You are not authorized for this request" in msg or "Please login first" in msg:
-                                return {}, True, "AUTH_DEVICE_KEY_EXPIRED"
-                            elif "Invalid User Access Token!" in msg:
-                                return {}, True, "AUTH_TOKEN_EXPIRED"
-                    return {}, True, "AUTH_TOKEN_EXPIRED"
-                except ValueError:
-                    return {}, True, "AUTH_TOKEN_EXPIRED"
-            
-            if response.status_code == 403:
-                return {}, True, "Currently we are experiencing high traffic. Please try again after some time."
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    return {}, True, "We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes."
-                continue
-            
-            response.raise_for_status()
-            data = response.json()
-            return analyze_issued_tickets(data, auth_token, device_key), False, ""
-            
-        except requests.RequestException as e:
-            status_code = e.response.status_code if e.response is not None else None
-            
-            if status_code == 429:
-                try:
-                    error_data = e.response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list) and error_messages:
-                        return {}, True, error_messages[0]
-                    return {}, True, "Too many requests. Please slow down."
-                except ValueError:
-                    return {}, True, "Too many requests. Please slow down."
-            
-            if status_code == 401:
-                try:
-                    error_data = e.response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list):
-                        for msg in error_messages:
-                            if "You are not authorized for this request" in msg or "Please login first" in msg:
-                                return {}, True, "AUTH_DEVICE_KEY_EXPIRED"
-                            elif "Invalid User Access Token!" in msg:
-                                return {}, True, "AUTH_TOKEN_EXPIRED"
-                    return {}, True, "AUTH_TOKEN_EXPIRED"
-                except ValueError:
-                    return {}, True, "AUTH_TOKEN_EXPIRED"
-            
-            retry_count += 1
-            if retry_count == max_retries:
-                return {}, True, f"Failed to fetch seat layout: {str(e)}"
-    
-    return {}, True, "Maximum retries exceeded"
+    try:
+        response = SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code == 429:
+            try:
+                error_data = json_loads(response.content)
+                error_messages = error_data.get("error", {}).get("messages", [])
+                if isinstance(error_messages, list) and error_messages:
+                    return {}, True, error_messages[0]
+                return {}, True, "Too many requests. Please slow down."
+            except ValueError:
+                return {}, True, "Too many requests. Please slow down."
+        
+        if response.status_code == 401:
+            try:
+                error_data = json_loads(response.content)
+                error_messages = error_data.get("error", {}).get("messages", [])
+                if isinstance(error_messages, list):
+                    for msg in error_messages:
+                        if "You are not authorized for this request" in msg or "Please login first" in msg:
+                            return {}, True, "AUTH_DEVICE_KEY_EXPIRED"
+                        elif "Invalid User Access Token!" in msg:
+                            return {}, True, "AUTH_TOKEN_EXPIRED"
+                return {}, True, "AUTH_TOKEN_EXPIRED"
+            except ValueError:
+                return {}, True, "AUTH_TOKEN_EXPIRED"
+        
+        if response.status_code == 403:
+            return {}, True, "Currently we are experiencing high traffic. Please try again after some time."
+        
+        if response.status_code >= 500:
+            return {}, True, "We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes."
+        
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return analyze_issued_tickets(data, auth_token, device_key), False, ""
+        
+    except requests.RequestException as e:
+        return {}, True, f"Failed to fetch seat layout: {str(e)}"
 
+@lru_cache(maxsize=512)
 def normalize_city_name_for_comparison(city_name: str) -> str:
     return city_name.lower().replace("'", "")
 
+@ttl_memoize(ttl=20, negative_ttl=5)
 def get_route_availability(from_city: str, to_city: str, date_str: str, target_model: str, auth_token: str, device_key: str) -> Dict:
     url = f"{API_BASE_URL}/app/bookings/search-trips-v2"
     params = {
@@ -174,96 +206,62 @@ def get_route_availability(from_city: str, to_city: str, date_str: str, target_m
         "x-device-key": device_key
     }
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            
-            if response.status_code == 429:
-                try:
-                    error_data = response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list) and error_messages:
-                        raise Exception(error_messages[0])
-                    raise Exception("Too many requests. Please slow down.")
-                except ValueError:
-                    raise Exception("Too many requests. Please slow down.")
-            
-            if response.status_code == 401:
-                try:
-                    error_data = response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list):
-                        for msg in error_messages:
-                            if "You are not authorized for this request" in msg or "Please login first" in msg:
-                                raise Exception("AUTH_DEVICE_KEY_EXPIRED")
-                            elif "Invalid User Access Token!" in msg:
-                                raise Exception("AUTH_TOKEN_EXPIRED")
-                    raise Exception("AUTH_TOKEN_EXPIRED")
-                except ValueError:
-                    raise Exception("AUTH_TOKEN_EXPIRED")
-            
-            if response.status_code == 403:
-                return None
-            
-            if response.status_code == 422:
-                return None
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    return None
-                continue
-            
-            response.raise_for_status()
-            
-            trains = response.json().get("data", {}).get("trains", [])
-            for train in trains:
-                if train.get("train_model") == target_model:
-                    returned_origin = train.get("origin_city_name", "")
-                    returned_destination = train.get("destination_city_name", "")
-                    
-                    if (normalize_city_name_for_comparison(from_city) == normalize_city_name_for_comparison(returned_origin) and
-                        normalize_city_name_for_comparison(to_city) == normalize_city_name_for_comparison(returned_destination)):
-                        return train
-            
+    try:
+        response = SESSION.get(url, headers=headers, params=params)
+        
+        if response.status_code == 429:
+            try:
+                error_data = json_loads(response.content)
+                error_messages = error_data.get("error", {}).get("messages", [])
+                if isinstance(error_messages, list) and error_messages:
+                    raise Exception(error_messages[0])
+                raise Exception("Too many requests. Please slow down.")
+            except ValueError:
+                raise Exception("Too many requests. Please slow down.")
+        
+        if response.status_code == 401:
+            try:
+                error_data = json_loads(response.content)
+                error_messages = error_data.get("error", {}).get("messages", [])
+                if isinstance(error_messages, list):
+                    for msg in error_messages:
+                        if "You are not authorized for this request" in msg or "Please login first" in msg:
+                            raise Exception("AUTH_DEVICE_KEY_EXPIRED")
+                        elif "Invalid User Access Token!" in msg:
+                            raise Exception("AUTH_TOKEN_EXPIRED")
+                raise Exception("AUTH_TOKEN_EXPIRED")
+            except ValueError:
+                raise Exception("AUTH_TOKEN_EXPIRED")
+        
+        if response.status_code == 403:
             return None
-            
-        except requests.RequestException as e:
-            status_code = e.response.status_code if e.response is not None else None
-            
-            if status_code == 429:
-                try:
-                    error_data = e.response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list) and error_messages:
-                        raise Exception(error_messages[0])
-                    raise Exception("Too many requests. Please slow down.")
-                except ValueError:
-                    raise Exception("Too many requests. Please slow down.")
-            
-            if status_code == 401:
-                try:
-                    error_data = e.response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list):
-                        for msg in error_messages:
-                            if "You are not authorized for this request" in msg or "Please login first" in msg:
-                                raise Exception("AUTH_DEVICE_KEY_EXPIRED")
-                            elif "Invalid User Access Token!" in msg:
-                                raise Exception("AUTH_TOKEN_EXPIRED")
-                    raise Exception("AUTH_TOKEN_EXPIRED")
-                except ValueError:
-                    raise Exception("AUTH_TOKEN_EXPIRED")
-                    
-            if hasattr(e, 'response') and e.response and e.response.status_code == 403:
-                return None
-            if retry_count == max_retries - 1:
-                return None
-            retry_count += 1
+        
+        if response.status_code == 422:
+            return None
+        
+        if response.status_code >= 500:
+            return None
+        
+        response.raise_for_status()
+        
+        trains = json_loads(response.content).get("data", {}).get("trains", [])
+        normalized_from = normalize_city_name_for_comparison(from_city)
+        normalized_to = normalize_city_name_for_comparison(to_city)
+        for train in trains:
+            if train.get("train_model") == target_model:
+                returned_origin = train.get("origin_city_name", "")
+                returned_destination = train.get("destination_city_name", "")
+                
+                if (normalized_from == normalize_city_name_for_comparison(returned_origin) and
+                    normalized_to == normalize_city_name_for_comparison(returned_destination)):
+                    return train
+        
+        return None
+        
+    except requests.RequestException:
+        return None
 
+@ttl_memoize(ttl=30, negative_ttl=5)
 def fetch_train_data(model: str, departure_date: str) -> Dict:
     url = "https://railspaapi.shohoz.com/v1.0/web/train-routes"
     payload = {
@@ -272,50 +270,29 @@ def fetch_train_data(model: str, departure_date: str) -> Dict:
     }
     headers = {'Content-Type': 'application/json'}
     
-    max_retries = 2
-    retry_count = 0
-    
-    while retry_count < max_retries:
-        try:
-            response = requests.post(url, json=payload, headers=headers)
-            
-            if response.status_code == 429:
-                try:
-                    error_data = response.json()
-                    error_messages = error_data.get("error", {}).get("messages", [])
-                    if isinstance(error_messages, list) and error_messages:
-                        raise Exception(error_messages[0])
-                    raise Exception("Too many requests. Please slow down.")
-                except ValueError:
-                    raise Exception("Too many requests. Please slow down.")
-            
-            if response.status_code == 403:
-                raise Exception("Currently we are experiencing high traffic. Please try again after some time.")
-            
-            if response.status_code >= 500:
-                retry_count += 1
-                if retry_count == max_retries:
-                    raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
-                continue
-            
-            response.raise_for_status()
-            return response.json().get('data')
-        except requests.RequestException as e:
-            if hasattr(e, 'response') and e.response:
-                if e.response.status_code == 429:
-                    try:
-                        error_data = e.response.json()
-                        error_messages = error_data.get("error", {}).get("messages", [])
-                        if isinstance(error_messages, list) and error_messages:
-                            raise Exception(error_messages[0])
-                        raise Exception("Too many requests. Please slow down.")
-                    except ValueError:
-                        raise Exception("Too many requests. Please slow down.")
-                if e.response.status_code == 403:
-                    raise Exception("Currently we are experiencing high traffic. Please try again after some time.")
-            if retry_count == max_retries - 1:
-                return None
-            retry_count += 1
+    try:
+        response = SESSION.post(url, json=payload, headers=headers)
+        
+        if response.status_code == 429:
+            try:
+                error_data = json_loads(response.content)
+                error_messages = error_data.get("error", {}).get("messages", [])
+                if isinstance(error_messages, list) and error_messages:
+                    raise Exception(error_messages[0])
+                raise Exception("Too many requests. Please slow down.")
+            except ValueError:
+                raise Exception("Too many requests. Please slow down.")
+        
+        if response.status_code == 403:
+            raise Exception("Currently we are experiencing high traffic. Please try again after some time.")
+        
+        if response.status_code >= 500:
+            raise Exception("We're unable to connect to the Bangladesh Railway website right now. Please try again in a few minutes.")
+        
+        response.raise_for_status()
+        return json_loads(response.content).get('data')
+    except requests.RequestException:
+        return None
 
 def process_single_route(trip_id: str, trip_route_id: str, from_station: str, to_station: str, seat_type: str, auth_token: str, device_key: str) -> Tuple[str, str, str, Dict]:
     result, has_error, error_message = get_seat_layout_for_route(trip_id, trip_route_id, auth_token, device_key)
@@ -326,9 +303,10 @@ def process_single_route(trip_id: str, trip_route_id: str, from_station: str, to
     return from_station, to_station, seat_type, result
 
 class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, generated_on=None, **kwargs):
         canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
+        self.generated_on = generated_on or datetime.now(ASIA_DHAKA).strftime('%d %B %Y')
+        self.page_count = 0
         self.primary_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
         
         try:
@@ -341,120 +319,128 @@ class NumberedCanvas(canvas.Canvas):
             self.page_font = 'Helvetica'
 
     def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
+        self.page_count += 1
+        self.draw_page_footer(self.page_count)
+        canvas.Canvas.showPage(self)
 
     def save(self):
-        num_pages = len(self._saved_page_states)
-        for (page_num, page_state) in enumerate(self._saved_page_states):
-            self.__dict__.update(page_state)
-            self.draw_page_number(page_num + 1, num_pages)
-            canvas.Canvas.showPage(self)
+        for page_num in range(1, self.page_count + 1):
+            self.draw_page_number(page_num, self.page_count)
         canvas.Canvas.save(self)
 
-    def draw_page_number(self, page_num, total_pages):
-        self.setFont(self.page_font, 10)
-        self.setFillColor(self.primary_green)
-        
-        page_text = f"Page {page_num} of {total_pages}"
-        footer_text = f"Bangladesh Railway Report Generator  •  {page_text}  •  Generated on {datetime.now(pytz.timezone('Asia/Dhaka')).strftime('%d %B %Y')}"
-        
+    def draw_page_footer(self, page_num):
         self.setStrokeColor(self.primary_green)
         self.setLineWidth(0.5)
         self.line(40, 45, A4[0] - 40, 45)
+        self.doForm(f"footer{page_num}")
+
+    def draw_page_number(self, page_num, total_pages):
+        page_text = f"Page {page_num} of {total_pages}"
+        footer_text = f"Bangladesh Railway Report Generator  •  {page_text}  •  Generated on {self.generated_on}"
         
+        self.beginForm(f"footer{page_num}")
         self.setFont(self.page_font, 8)
+        self.setFillColor(self.primary_green)
         self.drawCentredString(A4[0]/2, 32, footer_text)
+        self.endForm()
+
+def summarize_issued_matrices(issued_matrices: Dict) -> Dict[str, Tuple[int, int]]:
+    issued_summary = {}
+    
+    for seat_type in SEAT_TYPES:
+        ticket_counts = [len(seats) for from_routes in issued_matrices[seat_type].values() for seats in from_routes.values() if seats]
+        issued_summary[seat_type] = (len(ticket_counts), sum(ticket_counts))
+    
+    return issued_summary
 
-def create_route_summary_data(issued_matrices: Dict, fare_matrices: Dict, stations: List[str]) -> Dict:
+def create_route_summary_data(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], issued_summary: Dict = None) -> Dict:
     route_summary = {}
     
-    seat_types_with_data = []
-    for seat_type in ["S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR"]:
-        has_data = any(
-            any(len(seats) > 0 for seats in from_routes.values())
-            for from_routes in issued_matrices[seat_type].values()
-        )
-        if has_data:
-            seat_types_with_data.append(seat_type)
+    if issued_summary is None:
+        issued_summary = summarize_issued_matrices(issued_matrices)
+    seat_types_with_data = [seat_type for seat_type in SEAT_TYPES if issued_summary[seat_type][0]]
     
     for from_station in stations:
-        route_summary[from_station] = {}
+        from_summary = route_summary[from_station] = {}
+        issued_from = [(seat_type, issued_matrices[seat_type].get(from_station, {}), fare_matrices[seat_type].get(from_station, {}))
+                       for seat_type in seat_types_with_data]
+        
         for to_station in stations:
             if from_station != to_station:
-                route_summary[from_station][to_station] = {}
-                
-                for seat_type in seat_types_with_data:
-                    count = 0
-                    fare = 0
-                    if (from_station in issued_matrices[seat_type] and 
-                        to_station in issued_matrices[seat_type][from_station]):
-                        count = len(issued_matrices[seat_type][from_station][to_station])
-                    
-                    if (from_station in fare_matrices[seat_type] and 
-                        to_station in fare_matrices[seat_type][from_station]):
-                        fare = fare_matrices[seat_type][from_station][to_station]
-                    
-                    route_summary[from_station][to_station][seat_type] = {
-                        "count": count,
-                        "fare": fare
+                from_summary[to_station] = {
+                    seat_type: {
+                        "count": len(issued_routes.get(to_station, ())),
+                        "fare": fare_routes.get(to_station, 0)
                     }
+                    for seat_type, issued_routes, fare_routes in issued_from
+                }
     
     return route_summary, seat_types_with_data
 
+SEAT_LIST_WIDTH = 60
+
+def wrap_seat_list(seats: List[str], width: int = SEAT_LIST_WIDTH) -> List[str]:
+    lines = []
+    line = ""
+    last_index = len(seats) - 1
+    for index, seat in enumerate(seats):
+        if not line:
+            line = seat
+        elif len(line) + len(seat) + (2 if index == last_index else 3) <= width:
+            line = f"{line}, {seat}"
+        else:
+            lines.append(line + ",")
+            line = seat
+    if line:
+        lines.append(line)
+    return lines
+
 def format_seat_list(seats: List[str], for_pdf: bool = False) -> str:
     if not seats:
         return "None"
     
     seat_str = ", ".join(seats)
-    if for_pdf:
-        wrapped_lines = textwrap.wrap(seat_str, width=60)
-        return wrapped_lines
-    else:
-        wrapped = textwrap.fill(seat_str, width=60)
-        return wrapped
-
-def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], train_data: Dict, config: Dict):
-    
-    if not REPORTLAB_AVAILABLE:
-        return
+    if len(seat_str) <= SEAT_LIST_WIDTH:
+        return [seat_str] if for_pdf else seat_str
     
-    try:
-        font_regular_path = os.path.join("static/fonts", "PlusJakartaSans-Regular.ttf")
-        font_bold_path = os.path.join("static/fonts", "PlusJakartaSans-Bold.ttf")
-        font_bengali_path = os.path.join("static/fonts", "NotoSansBengali-Regular.ttf")
-        
-        pdfmetrics.registerFont(TTFont('PlusJakartaSans-Regular', font_regular_path))
-        pdfmetrics.registerFont(TTFont('PlusJakartaSans-Bold', font_bold_path))
-        pdfmetrics.registerFont(TTFont('NotoSansBengali-Regular', font_bengali_path))
+    wrapped_lines = wrap_seat_list(seats)
+    return wrapped_lines if for_pdf else "\n".join(wrapped_lines)
+
+PDF_FONTS = None
+PDF_STYLES = None
+PDF_SETUP_LOCK = threading.Lock()
+
+def register_pdf_fonts() -> Tuple[str, str, str, bool]:
+    global PDF_FONTS
+    with PDF_SETUP_LOCK:
+        if PDF_FONTS is not None:
+            return PDF_FONTS
         
-        regular_font = 'PlusJakartaSans-Regular'
-        bold_font = 'PlusJakartaSans-Bold'
-        bengali_font = 'NotoSansBengali-Regular'
-        use_taka_symbol = True
+        try:
+            font_names = ['PlusJakartaSans-Regular', 'PlusJakartaSans-Bold', 'NotoSansBengali-Regular']
+            for font_name in font_names:
+                pdfmetrics.registerFont(TTFont(font_name, os.path.join("static/fonts", f"{font_name}.ttf")))
+            
+            PDF_FONTS = ('PlusJakartaSans-Regular', 'PlusJakartaSans-Bold', 'NotoSansBengali-Regular', True)
+        except Exception:
+            PDF_FONTS = ('Helvetica', 'Helvetica-Bold', 'Helvetica', False)
         
-    except Exception:
-        regular_font = 'Helvetica'
-        bold_font = 'Helvetica-Bold'
-        bengali_font = 'Helvetica'
-        use_taka_symbol = False
+        return PDF_FONTS
+
+def get_pdf_styles() -> Dict:
+    global PDF_STYLES
+    if PDF_STYLES is not None:
+        return PDF_STYLES
     
-    timestamp = datetime.now(pytz.timezone('Asia/Dhaka')).strftime("%Y%m%d_%H%M%S")
-    filename = f"BDRAILWAY_ISSUED_TICKETS_REPORT_{config['train_model']}_{timestamp}.pdf"
+    regular_font, bold_font, bengali_font, use_taka_symbol = register_pdf_fonts()
+    primary_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0)
+    secondary_green = colors.Color(0x28/255.0, 0x8A/255.0, 0x5C/255.0)
+    accent_gray = colors.Color(0x6C/255.0, 0x75/255.0, 0x7D/255.0)
     
-    try:
-        doc = SimpleDocTemplate(filename, pagesize=A4, 
-                              rightMargin=40, leftMargin=40, 
-                              topMargin=40, bottomMargin=40)
-        
-        primary_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0) 
-        secondary_green = colors.Color(0x28/255.0, 0x8A/255.0, 0x5C/255.0)
-        light_green = colors.Color(0xE8/255.0, 0xF5/255.0, 0xF0/255.0)
-        accent_gray = colors.Color(0x6C/255.0, 0x75/255.0, 0x7D/255.0)
-        
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
+    styles = getSampleStyleSheet()
+    
+    PDF_STYLES = {
+        "title": ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
@@ -464,9 +450,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             textColor=primary_green,
             fontName=bold_font,
             leading=28
-        )
-        
-        subtitle_style = ParagraphStyle(
+        ),
+        "subtitle": ParagraphStyle(
             'SubtitleStyle',
             parent=styles['Normal'],
             fontSize=16,
@@ -474,9 +459,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             alignment=1,
             textColor=secondary_green,
             fontName=bold_font
-        )
-        
-        heading_style = ParagraphStyle(
+        ),
+        "heading": ParagraphStyle(
             'CustomHeading',
             parent=styles['Heading2'],
             fontSize=16,
@@ -487,22 +471,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             borderWidth=0,
             borderPadding=0,
             leftIndent=0
-        )
-        
-        section_title_style = ParagraphStyle(
-            'SectionTitleStyle',
-            parent=styles['Heading2'],
-            fontSize=18,
-            spaceAfter=25,
-            spaceBefore=20,
-            textColor=primary_green,
-            fontName=bold_font,
-            alignment=1,
-            leftIndent=0,
-            rightIndent=0
-        )
-        
-        info_style = ParagraphStyle(
+        ),
+        "info": ParagraphStyle(
             'InfoStyle',
             parent=styles['Normal'],
             fontSize=11,
@@ -510,15 +480,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             leftIndent=10,
             fontName=regular_font,
             textColor=colors.black
-        )
-        
-        story = []
-        
-        story.append(Paragraph("BANGLADESH RAILWAY", title_style))
-        story.append(Paragraph("ISSUED TICKETS REPORT", subtitle_style))
-
-        
-        disclaimer_style = ParagraphStyle(
+        ),
+        "disclaimer": ParagraphStyle(
             'DisclaimerStyle',
             parent=styles['Normal'],
             fontSize=9,
@@ -534,13 +497,133 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             leading=12,
             leftIndent=0,
             rightIndent=0
+        ),
+        "section_header": ParagraphStyle(
+            'SectionHeaderPara',
+            parent=styles['Normal'],
+            fontSize=18,
+            fontName=bold_font,
+            textColor=primary_green,
+            alignment=1,
+            leading=22
+        ),
+        "no_data": ParagraphStyle(
+            'NoDataStyle',
+            parent=styles['Normal'],
+            fontSize=12,
+            alignment=1,
+            textColor=accent_gray,
+            fontName=regular_font,
+            spaceAfter=20,
+            spaceBefore=20
+        ),
+        "train_info": ParagraphStyle(
+            'TrainInfoStyle',
+            parent=styles['Normal'],
+            fontSize=14,
+            spaceAfter=5,
+            alignment=1,
+            textColor=primary_green,
+            fontName=bold_font
+        ),
+        "route_info": ParagraphStyle(
+            'RouteInfoStyle',
+            parent=styles['Normal'],
+            fontSize=11,
+            spaceAfter=20,
+            alignment=1,
+            textColor=accent_gray,
+            fontName=regular_font
+        ),
+        "route_header": ParagraphStyle(
+            'RouteHeaderStyle',
+            parent=styles['Normal'],
+            fontName=bold_font,
+            fontSize=10,
+            alignment=1,
+            textColor=colors.white
+        ),
+        "route_cell": ParagraphStyle(
+            'RouteCellStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=1,
+            fontName=regular_font
+        ),
+        "route_empty": ParagraphStyle(
+            'RouteCountStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=1,
+            fontName=regular_font,
+            textColor=accent_gray
+        ),
+        "matrix_header": ParagraphStyle(
+            'HeaderStyle',
+            parent=styles['Normal'],
+            fontName=bold_font,
+            fontSize=11,
+            alignment=1,
+            textColor=colors.white
+        ),
+        "matrix_count": ParagraphStyle(
+            'CellStyle',
+            parent=styles['Normal'],
+            fontSize=11,
+            alignment=1,
+            fontName=bold_font,
+            textColor=primary_green
+        ),
+        "matrix_seat": ParagraphStyle(
+            'SeatStyle',
+            parent=styles['Normal'],
+            fontSize=9,
+            alignment=0,
+            fontName=regular_font,
+            leading=11
         )
+    }
+    return PDF_STYLES
+
+def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: List[str], train_data: Dict, config: Dict, output=None):
+    
+    if not REPORTLAB_AVAILABLE:
+        return
+    
+    regular_font, bold_font, bengali_font, use_taka_symbol = register_pdf_fonts()
+    pdf_styles = get_pdf_styles()
+    
+    now_dhaka = datetime.now(ASIA_DHAKA)
+    timestamp = now_dhaka.strftime("%Y%m%d_%H%M%S")
+    filename = f"BDRAILWAY_ISSUED_TICKETS_REPORT_{config['train_model']}_{timestamp}.pdf"
+    
+    try:
+        doc = SimpleDocTemplate(filename if output is None else output, pagesize=A4, 
+                              rightMargin=40, leftMargin=40, 
+                              topMargin=40, bottomMargin=40)
+        
+        primary_green = colors.Color(0x00/255.0, 0x67/255.0, 0x47/255.0) 
+        secondary_green = colors.Color(0x28/255.0, 0x8A/255.0, 0x5C/255.0)
+        light_green = colors.Color(0xE8/255.0, 0xF5/255.0, 0xF0/255.0)
+        
+        title_style = pdf_styles["title"]
+        subtitle_style = pdf_styles["subtitle"]
+        heading_style = pdf_styles["heading"]
+        info_style = pdf_styles["info"]
+        no_data_style = pdf_styles["no_data"]
+        route_cell_style = pdf_styles["route_cell"]
+        
+        story = []
+        
+        story.append(Paragraph("BANGLADESH RAILWAY", title_style))
+        story.append(Paragraph("ISSUED TICKETS REPORT", subtitle_style))
+
         
         disclaimer_text = ("DISCLAIMER: This report is generated for informational purposes only. "
                           "Data accuracy is not guaranteed and is not officially affiliated with Bangladesh Railway. "
                           "Please verify all information independently before making any decisions.")
         
-        disclaimer_table = Table([[Paragraph(disclaimer_text, disclaimer_style)]], colWidths=[7.2*inch])
+        disclaimer_table = Table([[Paragraph(disclaimer_text, pdf_styles["disclaimer"])]], colWidths=[7.2*inch])
         disclaimer_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, -1), colors.Color(1.0, 0.98, 0.98)),
             ('BORDER', (0, 0), (-1, -1), 1, colors.Color(0.9, 0.7, 0.7)),
@@ -568,7 +651,7 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             ["Train Name", train_data['train_name']],
             ["Running Days", ', '.join(train_data['days'])],
             ["Total Stations", str(len(stations))],
-            ["Report Generated", datetime.now(pytz.timezone('Asia/Dhaka')).strftime("%d %B %Y  |  %H:%M:%S")],
+            ["Report Generated", now_dhaka.strftime("%d %B %Y  |  %H:%M:%S")],
             ["Source Code", github_link],
             ["Utility Website 1", website1_link],
             ["Utility Website 2", website2_link]
@@ -577,9 +660,9 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         config_table_data = []
         for i, (key, value) in enumerate(config_data):
             if i >= 6:
-                config_table_data.append([Paragraph(key, info_style), Paragraph(value, info_style)])
+                config_table_data.append([key, Paragraph(value, info_style)])
             else:
-                config_table_data.append([Paragraph(key, info_style), Paragraph(str(value), info_style)])
+                config_table_data.append([key, str(value)])
         
         config_table = Table(config_table_data, colWidths=[2.2*inch, 3.3*inch])
         config_table.setStyle(TableStyle([
@@ -634,15 +717,7 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         story.append(stations_table)
         story.append(PageBreak())
         
-        summary_header_para = Paragraph("OVERALL SUMMARY", ParagraphStyle(
-            'SummaryHeaderPara',
-            parent=styles['Normal'],
-            fontSize=18,
-            fontName=bold_font,
-            textColor=primary_green,
-            alignment=1,
-            leading=22
-        ))
+        summary_header_para = Paragraph("OVERALL SUMMARY", pdf_styles["section_header"])
         
         section_header_table = Table([[summary_header_para]], colWidths=[7.2*inch], rowHeights=[50])
         section_header_table.setStyle(TableStyle([
@@ -659,19 +734,10 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         story.append(Spacer(1, 20))
         
         summary_data = [["Seat Type", "Available Routes", "Total Issued Tickets"]]
+        issued_summary = summarize_issued_matrices(issued_matrices)
         
-        seat_types = ["S_CHAIR", "SHOVAN", "SNIGDHA", "F_SEAT", "F_CHAIR", "AC_S", "F_BERTH", "AC_B", "SHULOV", "AC_CHAIR"]
-        
-        for seat_type in seat_types:
-            routes_with_tickets = 0
-            total_tickets = 0
-            
-            for from_routes in issued_matrices[seat_type].values():
-                for seats in from_routes.values():
-                    if seats:
-                        routes_with_tickets += 1
-                        total_tickets += len(seats)
-            
+        for seat_type in SEAT_TYPES:
+            routes_with_tickets, total_tickets = issued_summary[seat_type]
             if routes_with_tickets > 0:
                 summary_data.append([seat_type, str(routes_with_tickets), str(total_tickets)])
         
@@ -695,32 +761,14 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             ]))
             story.append(summary_table)
         else:
-            no_data_style = ParagraphStyle(
-                'NoDataStyle',
-                parent=styles['Normal'],
-                fontSize=12,
-                alignment=1,
-                textColor=accent_gray,
-                fontName=regular_font,
-                spaceAfter=20,
-                spaceBefore=20
-            )
             story.append(Paragraph("No issued tickets found for any seat type.", no_data_style))
 
         story.append(PageBreak())
         
         
-        route_summary, seat_types_with_data = create_route_summary_data(issued_matrices, fare_matrices, stations)
+        route_summary, seat_types_with_data = create_route_summary_data(issued_matrices, fare_matrices, stations, issued_summary)
         
-        route_header_para = Paragraph("ROUTE-WISE ISSUED TICKET SUMMARY", ParagraphStyle(
-            'RouteHeaderPara',
-            parent=styles['Normal'],
-            fontSize=18,
-            fontName=bold_font,
-            textColor=primary_green,
-            alignment=1,
-            leading=22
-        ))
+        route_header_para = Paragraph("ROUTE-WISE ISSUED TICKET SUMMARY", pdf_styles["section_header"])
         
         route_section_header_table = Table([[route_header_para]], colWidths=[7.2*inch], rowHeights=[50])
         route_section_header_table.setStyle(TableStyle([
@@ -736,32 +784,12 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         story.append(route_section_header_table)
         story.append(Spacer(1, 10))
 
-        train_info_style = ParagraphStyle(
-            'TrainInfoStyle',
-            parent=styles['Normal'],
-            fontSize=14,
-            spaceAfter=5,
-            alignment=1,
-            textColor=primary_green,
-            fontName=bold_font
-        )
-        
-        route_info_style = ParagraphStyle(
-            'RouteInfoStyle',
-            parent=styles['Normal'],
-            fontSize=11,
-            spaceAfter=20,
-            alignment=1,
-            textColor=accent_gray,
-            fontName=regular_font
-        )
-        
-        story.append(Paragraph(f"{train_data['train_name']}", train_info_style))
+        story.append(Paragraph(f"{train_data['train_name']}", pdf_styles["train_info"]))
         
         origin_station = stations[0] if stations else "Unknown"
         destination_station = stations[-1] if stations else "Unknown"
         route_text = f"{origin_station} → {destination_station}"
-        story.append(Paragraph(route_text, route_info_style))
+        story.append(Paragraph(route_text, pdf_styles["route_info"]))
         
         if seat_types_with_data:
             table_headers = ["From Station", "To Station"] + seat_types_with_data
@@ -769,12 +797,7 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
             
             header_row = []
             for header in table_headers:
-                header_row.append(Paragraph(header, ParagraphStyle('RouteHeaderStyle',
-                                                                  parent=styles['Normal'],
-                                                                  fontName=bold_font,
-                                                                  fontSize=10,
-                                                                  alignment=1,
-                                                                  textColor=colors.white)))
+                header_row.append(Paragraph(header, pdf_styles["route_header"]))
             route_table_data.append(header_row)
             
             for from_station in stations:
@@ -787,16 +810,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                         
                         if has_tickets:
                             row = []
-                            row.append(Paragraph(from_station, ParagraphStyle('RouteCellStyle',
-                                                                             parent=styles['Normal'],
-                                                                             fontSize=10,
-                                                                             alignment=1,
-                                                                             fontName=regular_font)))
-                            row.append(Paragraph(to_station, ParagraphStyle('RouteCellStyle',
-                                                                           parent=styles['Normal'],
-                                                                           fontSize=10,
-                                                                           alignment=1,
-                                                                           fontName=regular_font)))
+                            row.append(Paragraph(from_station, route_cell_style))
+                            row.append(Paragraph(to_station, route_cell_style))
                             
                             for seat_type in seat_types_with_data:
                                 count = route_summary[from_station][to_station][seat_type]["count"]
@@ -807,19 +822,10 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                                     else:
                                         count_text = f'<font size="10" color="#006747" face="{bold_font}">{count}</font><br/><font size="8" color="gray" face="{regular_font}">BDT {fare:.0f}</font>'
                                     
-                                    count_style = ParagraphStyle('RouteCountStyle',
-                                                            parent=styles['Normal'],
-                                                            fontSize=10,
-                                                            alignment=1,
-                                                            fontName=regular_font)
+                                    count_style = route_cell_style
                                 else:
                                     count_text = "—"
-                                    count_style = ParagraphStyle('RouteCountStyle',
-                                                            parent=styles['Normal'],
-                                                            fontSize=10,
-                                                            alignment=1,
-                                                            fontName=regular_font,
-                                                            textColor=accent_gray)
+                                    count_style = pdf_styles["route_empty"]
                                 row.append(Paragraph(count_text, count_style))
                             
                             route_table_data.append(row)
@@ -859,22 +865,9 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
         
         story.append(PageBreak())
         
-        for seat_type in seat_types:
-            has_issued_tickets = any(
-                any(len(seats) > 0 for seats in from_routes.values())
-                for from_routes in issued_matrices[seat_type].values()
-            )
-            
-            if has_issued_tickets:
-                matrix_header_para = Paragraph(f"ISSUED TICKETS — {seat_type}", ParagraphStyle(
-                    'MatrixHeaderPara',
-                    parent=styles['Normal'],
-                    fontSize=18,
-                    fontName=bold_font,
-                    textColor=primary_green,
-                    alignment=1,
-                    leading=22
-                ))
+        for seat_type in SEAT_TYPES:
+            if issued_summary[seat_type][0]:
+                matrix_header_para = Paragraph(f"ISSUED TICKETS — {seat_type}", pdf_styles["section_header"])
                 
                 matrix_title_table = Table([[matrix_header_para]], colWidths=[7.2*inch], rowHeights=[50])
                 matrix_title_table.setStyle(TableStyle([
@@ -893,12 +886,7 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                 
                 table_data = []
                 headers = ["From Station", "To Station", "Count", "Seat Numbers"]
-                table_data.append([Paragraph(h, ParagraphStyle('HeaderStyle', 
-                                                              parent=styles['Normal'],
-                                                              fontName=bold_font,
-                                                              fontSize=11,
-                                                              alignment=1,
-                                                              textColor=colors.white)) for h in headers])
+                table_data.append([Paragraph(h, pdf_styles["matrix_header"]) for h in headers])
                 
                 for from_city in stations:
                     for to_city in stations:
@@ -916,37 +904,19 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                                     
                                     from_para = Paragraph(
                                         from_city if i == 0 else f"{from_city} (cont.)",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=10,
-                                                       alignment=1,
-                                                       fontName=regular_font)
+                                        route_cell_style
                                     )
                                     to_para = Paragraph(
                                         to_city if i == 0 else f"{to_city} (cont.)",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=10,
-                                                       alignment=1,
-                                                       fontName=regular_font)
+                                        route_cell_style
                                     )
                                     count_para = Paragraph(
                                         str(seat_count) if i == 0 else "",
-                                        ParagraphStyle('CellStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=11,
-                                                       alignment=1,
-                                                       fontName=bold_font,
-                                                       textColor=primary_green)
+                                        pdf_styles["matrix_count"]
                                     )
                                     seats_para = Paragraph(
                                         seat_str,
-                                        ParagraphStyle('SeatStyle',
-                                                       parent=styles['Normal'],
-                                                       fontSize=9,
-                                                       alignment=0,
-                                                       fontName=regular_font,
-                                                       leading=11)
+                                        pdf_styles["matrix_seat"]
                                     )
                                     
                                     table_data.append([from_para, to_para, count_para, seats_para])
@@ -982,8 +952,8 @@ def generate_pdf_report(issued_matrices: Dict, fare_matrices: Dict, stations: Li
                 
                 story.append(PageBreak())
         
-        doc.build(story, canvasmaker=NumberedCanvas)
-        return filename
+        doc.build(story, canvasmaker=partial(NumberedCanvas, generated_on=now_dhaka.strftime('%d %B %Y')))
+        return filename if output is None else output
         
     except Exception:
         return None
@@ -1037,11 +1007,8 @@ def generate_report(train_model: str, date_of_journey: str, auth_token: str, dev
             
             station_dates[station] = current_date.strftime("%d-%b-%Y")
         
-        seat_types = ["AC_B", "AC_S", "SNIGDHA", "F_BERTH", "F_SEAT", "F_CHAIR",
-                      "S_CHAIR", "SHOVAN", "SHULOV", "AC_CHAIR"]
-        
-        issued_matrices = {seat_type: {} for seat_type in seat_types}
-        fare_matrices = {seat_type: {} for seat_type in seat_types}
+        issued_matrices = {seat_type: {} for seat_type in SEAT_TYPES}
+        fare_matrices = {seat_type: {} for seat_type in SEAT_TYPES}
 
         with ThreadPoolExecutor(max_workers=10) as executor:
             futures = []
@@ -1053,6 +1020,7 @@ def generate_report(train_model: str, date_of_journey: str, auth_token: str, dev
                         future = executor.submit(get_route_availability, from_city, to_city, route_date, train_model, auth_token, device_key)
                         futures.append((future, from_city, to_city))
             
+            layout_futures = []
             for future, from_city, to_city in futures:
                 route_train_data = future.result()
                 
@@ -1070,18 +1038,20 @@ def generate_report(train_model: str, date_of_journey: str, auth_token: str, dev
                                 fare_matrices[seat_type_name][from_city] = {}
                             fare_matrices[seat_type_name][from_city][to_city] = fare + vat_amount
                             
-                            issued_info, has_error, error_msg = get_seat_layout_for_route(
-                                seat_type["trip_id"], seat_type["trip_route_id"], auth_token, device_key
-                            )
-                            
-                            if not has_error and issued_info.get("count", 0) > 0:
-                                if from_city not in issued_matrices[seat_type_name]:
-                                    issued_matrices[seat_type_name][from_city] = {}
-                                issued_matrices[seat_type_name][from_city][to_city] = issued_info["issued_tickets"]
-                            else:
-                                if from_city not in issued_matrices[seat_type_name]:
-                                    issued_matrices[seat_type_name][from_city] = {}
-                                issued_matrices[seat_type_name][from_city][to_city] = []
+                            layout_futures.append(executor.submit(
+                                process_single_route, seat_type["trip_id"], seat_type["trip_route_id"],
+                                from_city, to_city, seat_type_name, auth_token, device_key
+                            ))
+            
+            for future in as_completed(layout_futures):
+                from_city, to_city, seat_type_name, issued_info = future.result()
+                
+                if from_city not in issued_matrices[seat_type_name]:
+                    issued_matrices[seat_type_name][from_city] = {}
+                if "error" not in issued_info and issued_info.get("count", 0) > 0:
+                    issued_matrices[seat_type_name][from_city][to_city] = issued_info["issued_tickets"]
+                else:
+                    issued_matrices[seat_type_name][from_city][to_city] = []
         
         train_info = {
             'train_name': train_data.get('train_name', f"Train {train_model}"),